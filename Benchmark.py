@@ -0,0 +1,293 @@
+""" time board operations, analyzers, robots and html rendering across board shapes and player counts, and how long
+importing each module takes from a fresh interpreter. Results are written as JSON and can be compared against a saved
+baseline so slowdowns show up in review:
+    python Benchmark.py --output baseline.json
+    python Benchmark.py --baseline baseline.json
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+import numpy as np
+
+SHAPES = [(7, 6), (20, 20), (50, 50), (100, 100)]
+PLAYER_COUNTS = [2, 4]
+BENCHMARKS = OrderedDict()  # name -> function(shape, numPlayers) that returns the callable to be timed
+STARTUP_MODULES = ['Game', 'BitBoard', 'RobotBoard', 'HtmlBoard', 'Simulator', 'main']
+
+
+def benchmark(fxn):
+    """ register benchmark. fxn prepares state for a shape and player count, and returns a function to time """
+    BENCHMARKS[fxn.__name__] = fxn
+    return fxn
+
+
+def make_game(shape, numPlayers, removeFraction=0.2, seed=0):
+    """ return HtmlGame in a mid-game state: removeFraction of the tiles have been removed at random """
+    from HtmlBoard import HtmlGame
+    rand = random.Random(seed)
+    game = HtmlGame()
+    game.setup(numPlayers, shape)
+    board = game.board
+    tiles = board.get_all_open_removable_tiles()
+    for tile in rand.sample(tiles, int(len(tiles) * removeFraction)):
+        board.remove_at(tile.x, tile.y)
+    return game
+
+
+@benchmark
+def board_setup(shape, numPlayers):
+    from Game import Game
+
+    def run():
+        Game().setup(numPlayers, shape)
+    return run
+
+
+@benchmark
+def is_player_trapped(shape, numPlayers):
+    game = make_game(shape, numPlayers)
+    board = game.board
+
+    def run():
+        for player in board.players:
+            board.is_player_trapped(player)
+    return run
+
+
+@benchmark
+def get_all_open_removable_tiles(shape, numPlayers):
+    board = make_game(shape, numPlayers).board
+    return board.get_all_open_removable_tiles
+
+
+@benchmark
+def to_number_grid(shape, numPlayers):
+    board = make_game(shape, numPlayers).board
+    return board.to_number_grid
+
+
+@benchmark
+def neighbor_sum(shape, numPlayers):
+    import BoardAnalyzer
+    grid = make_game(shape, numPlayers).board.to_number_grid(players=0)
+    return lambda: BoardAnalyzer.neighbor_sum(grid)
+
+
+@benchmark
+def neighbor_sum_scipy(shape, numPlayers):
+    """ the general convolution neighbor_sum replaced, for comparison. Skipped if scipy is not installed """
+    from scipy import signal
+    grid = make_game(shape, numPlayers).board.to_number_grid(players=0)
+    kernel = np.ones((3, 3), dtype=np.int32)
+    return lambda: signal.convolve(grid, kernel, mode='same')
+
+
+@benchmark
+def sweet_spot_next_move(shape, numPlayers):
+    import BoardAnalyzer
+    game = make_game(shape, numPlayers)
+    player = game.get_active_player()
+
+    def run():
+        sweetspotter = BoardAnalyzer.SweetSpotGrid(game.board.to_number_grid)
+        grid = sweetspotter.originalGrid
+        sweetspotter.get_next_move_toward_sweet_spot(grid, player.x, player.y)
+    return run
+
+
+@benchmark
+def sweet_spot_batch_16(shape, numPlayers):
+    import BoardAnalyzer
+    games = [make_game(shape, numPlayers, seed=seed) for seed in range(16)]
+    positions = [(game.get_active_player().x, game.get_active_player().y) for game in games]
+
+    def run():
+        batch = BoardAnalyzer.BatchSweetSpotGrid.from_boards([game.board for game in games])
+        batch.get_next_moves_toward_sweet_spots(positions)
+    return run
+
+
+@benchmark
+def move_bot_turn(shape, numPlayers):
+    import BoardAnalyzer
+    from RobotBoard import MoveBot
+    game = make_game(shape, numPlayers)
+    player = game.get_active_player()
+    bot = MoveBot(game, game.board, player)
+    bot.SweetSpotGrid = BoardAnalyzer.SweetSpotGrid  # time the analysis itself, not the cache
+
+    def run():
+        bot.take_move_player_turn(lambda x, y: None)
+    return run
+
+
+@benchmark
+def html_render(shape, numPlayers):
+    game = make_game(shape, numPlayers)
+    return game.get_html
+
+
+@benchmark
+def html_render_remove(shape, numPlayers):
+    game = make_game(shape, numPlayers)
+    game.turnType = game.REMOVE_TILE  # every open tile links to its removal
+    return game.get_html
+
+
+@benchmark
+def html_render_alternating(shape, numPlayers):
+    """ render move and remove turns in turn, as a game does """
+    game = make_game(shape, numPlayers)
+    turnTypes = [game.MOVE_PLAYER, game.REMOVE_TILE]
+
+    def run():
+        game.turnType = turnTypes[game.turnType == game.MOVE_PLAYER]
+        game.get_html()
+    return run
+
+
+def time_call(fxn, minTime=0.2, repeat=3):
+    """ return best seconds-per-call of fxn, over repeat rounds that each last at least minTime / repeat seconds """
+    number = 1
+    roundTime = minTime / repeat
+    while True:  # find number of calls that fill one round
+        start = time.time()
+        for i in range(number):
+            fxn()
+        elapsed = time.time() - start
+        if elapsed >= roundTime:
+            break
+        number *= 2
+    best = elapsed / number
+    for i in range(repeat - 1):
+        start = time.time()
+        for i in range(number):
+            fxn()
+        best = min(best, (time.time() - start) / number)
+    return best
+
+
+def run_benchmarks(names=None, shapes=SHAPES, playerCounts=PLAYER_COUNTS, minTime=0.2, log=None):
+    """ run registered benchmarks (all if names is None). Return list of result dictionaries """
+    results = []
+    for name in names or BENCHMARKS:
+        for shape in shapes:
+            for numPlayers in playerCounts:
+                try:
+                    fxn = BENCHMARKS[name](shape, numPlayers)
+                except ImportError as e:  # benchmark of an optional dependency
+                    if log:
+                        log('{0:<30} skipped: {1}'.format(name, e))
+                    break
+                seconds = time_call(fxn, minTime)
+                result = {'benchmark': name, 'shape': list(shape), 'players': numPlayers, 'secondsPerCall': seconds}
+                results.append(result)
+                if log:
+                    log(format_result(result))
+    return results
+
+
+def time_import(module, repeat=5):
+    """ return best seconds taken to import module in a fresh interpreter, excluding the interpreter's own startup """
+    code = 'import time; start = time.time(); import ' + module + '; print(time.time() - start)'
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for i in range(repeat):
+        seconds = float(subprocess.check_output([sys.executable, '-c', code], cwd=here))
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def run_startup_benchmarks(modules=STARTUP_MODULES, log=None):
+    """ time importing each module (skipping modules whose dependencies are missing). Return list of results """
+    results = []
+    for module in modules:
+        try:
+            seconds = time_import(module)
+        except subprocess.CalledProcessError:
+            if log:
+                log('{0:<30} skipped: import failed'.format('import_' + module))
+            continue
+        result = {'benchmark': 'import_' + module, 'shape': [], 'players': 0, 'secondsPerCall': seconds}
+        results.append(result)
+        if log:
+            log(format_result(result))
+    return results
+
+
+def get_result_key(result):
+    return (result['benchmark'], tuple(result['shape']), result['players'])
+
+
+def format_result(result, baselineSeconds=None):
+    size = 'x'.join([str(n) for n in result['shape']]) or '-'  # startup results have no board
+    line = '{0:<30} {1:>8} {2:>2}p {3:>12.1f}us'.format(result['benchmark'], size,
+                                                      result['players'], result['secondsPerCall'] * 1e6)
+    if baselineSeconds:
+        line += '  {0:>6.2f}x baseline'.format(result['secondsPerCall'] / baselineSeconds)
+    return line
+
+
+def compare(results, baseline, tolerance=0.25):
+    """ return list of (result, baselineSeconds) for results that are more than tolerance slower than baseline """
+    baselineSeconds = dict((get_result_key(result), result['secondsPerCall']) for result in baseline['results'])
+    regressions = []
+    for result in results:
+        before = baselineSeconds.get(get_result_key(result))
+        if before and result['secondsPerCall'] > before * (1 + tolerance):
+            regressions.append((result, before))
+    return regressions
+
+
+def parse_shape(text):
+    w, h = text.lower().split('x')
+    return (int(w), int(h))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark pysolation board operations, analyzers and rendering')
+    parser.add_argument('names', nargs='*', help='benchmarks to run (default all): ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--shapes', nargs='+', type=parse_shape, default=SHAPES, help='board shapes, like 7x6')
+    parser.add_argument('--players', nargs='+', type=int, default=PLAYER_COUNTS)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds spent timing each case')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against results previously saved with --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='fraction slower than baseline to report')
+    parser.add_argument('--startup', action='store_true', help='only time module imports (also run when no '
+                                                               'benchmark names are given)')
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error('unknown benchmark ' + name)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = []
+    if not args.startup:
+        results += run_benchmarks(args.names, args.shapes, args.players, args.min_time, log=print)
+    if args.startup or not args.names:
+        results += run_startup_benchmarks(log=print)
+    if args.output:
+        report = {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                  'results': results}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for result, before in regressions:
+            print('REGRESSION ' + format_result(result, before))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
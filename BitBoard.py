@@ -0,0 +1,141 @@
+from Board import GameBoard
+from Game import Game
+from LazyImport import lazy_import
+np = lazy_import('numpy')
+
+
+_maskCache = dict()  # (w, h) -> (aroundMasks, neighborMasks), shared by every board of the same shape
+
+
+def get_shape_masks(w, h):
+    """ return two lists of integer bitmasks, indexed by bit index (x * h + y). The first list holds the 3x3 block
+    around each coordinate, including the coordinate itself. The second list holds only the surrounding neighbors.
+    Masks are computed once per board shape and then shared.
+    """
+    key = (w, h)
+    if key in _maskCache:
+        return _maskCache[key]
+    aroundMasks = [0] * (w * h)
+    neighborMasks = [0] * (w * h)
+    for x in range(w):
+        for y in range(h):
+            mask = 0
+            for x2 in range(max(0, x - 1), min(w, x + 2)):
+                for y2 in range(max(0, y - 1), min(h, y + 2)):
+                    mask |= 1 << (x2 * h + y2)
+            i = x * h + y
+            aroundMasks[i] = mask
+            neighborMasks[i] = mask & ~(1 << i)
+    _maskCache[key] = (aroundMasks, neighborMasks)
+    return aroundMasks, neighborMasks
+
+
+def get_bits_from_mask(mask):
+    """ return integer with bit (x * h + y) set wherever boolean (w, h) array mask is True """
+    return int.from_bytes(np.packbits(mask.ravel(), bitorder='little').tobytes(), 'little')
+
+
+class BitBoardMixin(object):
+    """ Keeps visible, solid, and occupied state of every Tile as one python integer each, where bit (x * h + y)
+    represents the Tile at x, y. Rule checks and tile searches become a handful of bitwise operations instead of
+    walking Tile objects. Tiles and Players are still kept up-to-date, so they remain usable as a view of the board
+    (for exporting to html, for example). Moves therefore update the bits on top of the Tiles, cellStates and
+    landableCounts, and cost about as much as on a GameBoard: rule checks run about 4x faster on a 7x6 board, but
+    random games play only about 2x faster (around a thousand per second), as making moves is most of their cost.
+    See test_BitBoard.py. Mix in before a GameBoard class: class MyBoard(BitBoardMixin, GameBoard)
+
+    Attributes:
+        visibleBits: bit set if Tile has not been removed
+        solidBits: bit set if Tile cannot be removed
+        occupiedBits: bit set if a Player occupies Tile
+    """
+    visibleBits = 0
+    solidBits = 0
+    occupiedBits = 0
+
+    def setup(self, size=(9,9)):
+        super(BitBoardMixin, self).setup(size)
+        self.aroundMasks, self.neighborMasks = get_shape_masks(self.w, self.h)
+        self.tileList = None  # tiles created on demand (see LazyTileMixin) are looked up by coordinate instead
+        if isinstance(self.board, np.ndarray):
+            self.tileList = list(self.board.flat)  # flat index of numpy (w, h) array matches bit index
+        self.visibleBits = (1 << (self.w * self.h)) - 1  # a freshly set up board has every tile, none solid
+        self.solidBits = 0
+        self.occupiedBits = 0
+
+    def bit_at(self, x, y):
+        """ return integer with only the bit representing x, y set. Out-of-bounds coordinates return 0 """
+        if self.out_of_bounds(x, y):
+            return 0
+        return 1 << (x * self.h + y)
+
+    def get_landable_bits(self):
+        """ return bits of all visible, unoccupied tiles """
+        return self.visibleBits & ~self.occupiedBits
+
+    def get_removable_bits(self):
+        """ return bits of all visible, unoccupied, non-solid tiles """
+        return self.visibleBits & ~self.occupiedBits & ~self.solidBits
+
+    def get_tiles_from_bits(self, bits):
+        """ return list of tiles whose bits are set, in board-iteration order """
+        tiles = []
+        tileList = self.tileList
+        while bits:
+            lowest = bits & -bits
+            i = lowest.bit_length() - 1
+            tiles.append(tileList[i] if tileList is not None else self.board[divmod(i, self.h)])
+            bits ^= lowest
+        return tiles
+
+    def remove_at(self, x, y):
+        super(BitBoardMixin, self).remove_at(x, y)
+        self.visibleBits &= ~self.bit_at(x, y)
+
+    def restore_at(self, x, y):
+        super(BitBoardMixin, self).restore_at(x, y)
+        self.visibleBits |= self.bit_at(x, y)
+
+    def move_player(self, player, x, y):
+        self.occupiedBits &= ~self.bit_at(player.x, player.y)
+        super(BitBoardMixin, self).move_player(player, x, y)
+        self.occupiedBits |= self.bit_at(x, y)
+
+    def set_solid_at(self, x, y, tf):
+        super(BitBoardMixin, self).set_solid_at(x, y, tf)
+        if tf:
+            self.solidBits |= self.bit_at(x, y)
+        else:
+            self.solidBits &= ~self.bit_at(x, y)
+
+    def get_landable_tiles_around(self, x, y):
+        bits = self.aroundMasks[x * self.h + y] & self.get_landable_bits()
+        return self.get_tiles_from_bits(bits)
+
+    def get_removable_tiles_around(self, x, y):
+        bits = self.aroundMasks[x * self.h + y] & self.get_removable_bits()
+        return self.get_tiles_from_bits(bits)
+
+    def get_all_open_removable_tiles(self):
+        return self.get_tiles_from_bits(self.get_removable_bits())
+
+    def is_valid_player_move(self, player, x, y):
+        around = self.aroundMasks[player.x * self.h + player.y]
+        return bool(self.bit_at(x, y) & around & self.get_landable_bits())
+
+    def is_valid_tile_remove(self, x, y):
+        return bool(self.bit_at(x, y) & self.get_removable_bits())
+
+    def is_player_trapped(self, player):
+        neighbors = self.neighborMasks[player.x * self.h + player.y]
+        return not neighbors & self.get_landable_bits()
+
+
+class BitGameBoard(BitBoardMixin, GameBoard):
+    """ GameBoard whose rules are answered from integer bitmasks. See BitBoardMixin """
+
+
+class BitGame(Game):
+    """ Game played on a BitGameBoard. Useful for robots and simulations that check rules often """
+    GameBoard = BitGameBoard
+
@@ -1,9 +1,32 @@
-import numpy as np
 import math
+import weakref
+from LazyImport import lazy_import
+np = lazy_import('numpy')  # loaded on first use, so importing the rules stays fast
+
+
+_neighborCache = dict()  # (w, h) -> neighbor indexes of every cell, shared by every board of the same shape
+
+
+def get_neighbor_indexes(w, h):
+    """ return list, indexed by flat cell index (x * h + y), of tuples holding the flat indexes of the up to 8 cells
+    neighboring that cell. Computed once per board shape and then shared.
+    """
+    key = (w, h)
+    if key not in _neighborCache:
+        neighbors = []
+        for x in range(w):
+            for y in range(h):
+                neighbors.append(tuple(x2 * h + y2 for x2 in range(max(0, x - 1), min(w, x + 2))
+                                       for y2 in range(max(0, y - 1), min(h, y + 2)) if x2 != x or y2 != y))
+        _neighborCache[key] = neighbors
+    return _neighborCache[key]
 
 
 #=================================================================
 class _GamePieceAccess:
+    GAP_STATE = 0  # values of cellStates, the numeric mirror of the Tiles kept up-to-date on every move / remove
+    TILE_STATE = 1
+    PLAYER_STATE = 2
 
     def __iter__(self):
         for x in range(self.w):
@@ -20,17 +43,53 @@ class _GamePieceAccess:
         """ return player attribute of tile at specified x, y coordinates """
         return self[x, y].player
 
+    def set_cell_state(self, x, y, state):
+        """ set cellStates at x, y, keeping the landable-neighbor count of the surrounding cells in step. A cell is
+        landable when it holds a Tile without a Player (TILE_STATE)
+        """
+        wasLandable = self.cellStates.item(x, y) == self.TILE_STATE
+        self.cellStates[x, y] = state
+        isLandable = state == self.TILE_STATE
+        if isLandable != wasLandable:
+            change = 1 if isLandable else -1
+            counts = self.landableCounts
+            for i in self.neighborIndexes[x * self.h + y]:
+                counts[i] += change
+
     def remove_at(self, x, y):
         """ "Remove" Tile at specified coordinate. This will set the visible attribute to False """
-        self.board[x, y].visible = False
+        self._store_visible(x, y, False)
+        self.set_cell_state(x, y, self.GAP_STATE)
+
+    def restore_at(self, x, y):
+        """ put back Tile previously removed at specified coordinate, undoing remove_at """
+        self._store_visible(x, y, True)
+        self.set_cell_state(x, y, self.TILE_STATE)
+
+    def set_solid_at(self, x, y, tf):
+        """ set whether Tile at specified coordinate can be removed. Solid Tiles (tf=True) cannot be removed """
+        self._store_solid(x, y, tf)
+        if tf:
+            self.solidCells.add((x, y))
+        else:
+            self.solidCells.discard((x, y))
+
+    def _store_visible(self, x, y, tf):
+        """ write visible to the Tile at x, y. Only remove_at and restore_at may call it, so cellStates stays in step """
+        self.board[x, y].visible = tf
+
+    def _store_solid(self, x, y, tf):
+        self.board[x, y].solid = tf
 
     def move_player(self, player, x, y):
         """ move player from occupied tile to tile @ x, y coordinates. """
         tile = self[player.x, player.y]
         tile.player = None
+        self.set_cell_state(player.x, player.y, self.TILE_STATE)
         player.move_to(x, y)
         target = self[x, y]
         target.player = player
+        self.set_cell_state(x, y, self.PLAYER_STATE)
 
 
 #=================================================================
@@ -49,12 +108,25 @@ class _BoardSetup(_GamePieceAccess):
         self.shape = (h, w)
         self.w = w
         self.h = h
+        self.cellStates = np.zeros((w, h), dtype=np.int8) + self.TILE_STATE
+        self.neighborIndexes = get_neighbor_indexes(w, h)
+        self.landableCounts = [len(neighbors) for neighbors in self.neighborIndexes]  # every cell starts landable
+        self.solidCells = set()
+        self.board = self.create_tile_array(w, h)
+        self.players = []
+
+    def count_landable_neighbors(self):
+        """ return landableCounts recounted from scratch from cellStates """
+        landable = (self.cellStates == self.TILE_STATE).flatten().tolist()
+        return [sum(landable[i] for i in neighbors) for neighbors in self.neighborIndexes]
+
+    def create_tile_array(self, w, h):
+        """ return w by h numpy array of Tiles """
         rows = []
         for x in range(w):
             col = [self.Tile(x,y) for y in range(h)]
             rows.append(col)
-        self.board = np.array(rows)
-        self.players = []
+        return np.array(rows)
 
     def add_players(self, qty):
         """ add players to the board in quantity specified, spacing them equally apart """
@@ -165,33 +237,96 @@ class _RuleValidator(_TileFinder):
 
     def is_valid_player_move(self, player, x, y):
         """ :return: True if x, y coordinate is an open tile, visible, and next to the specified player, False otherwise. """
-        if not self[x, y].visible:
-            return False
-        if not self[x, y] in self.get_tiles_around(player.x, player.y):
-            return False
-        if self.get_player_at(x, y):
+        if abs(x - player.x) > 1 or abs(y - player.y) > 1 or self.out_of_bounds(x, y):
             return False
-        return True
+        return bool(self.cellStates[x, y] == self.TILE_STATE)  # visible and unoccupied
 
     def is_valid_tile_remove(self, x, y):
         """ :return: True if Tile is visible on board, not solid, and unoccupied by a player, False otherwise. """
-        if not self[x, y].visible:
+        if self.cellStates[x, y] != self.TILE_STATE:  # removed or occupied
             return False
-        if self[x, y].solid:
-            return False
-        if self.get_player_at(x, y):
-            return False
-        return True
+        return not self[x, y].solid
 
     def is_player_trapped(self, player):
         """ determine if player token is unable to move from current position.
         :param player: player instance to check
         :return: False if any tiles surrounding player is a valid move, True otherwise
         """
-        for tile in self.get_tiles_around(player.x, player.y):
-            if self.is_valid_player_move(player, tile.x, tile.y):
-                return False
-        return True    
+        return not self.landableCounts[player.x * self.h + player.y]
+
+
+#=================================================================
+class LazyTileArray(object):
+    """ stands in for the numpy array of Tiles, without holding any. Tiles are created when addressed, as TileViews
+    over the board's state, and are shared for as long as anything holds on to them. Supports the indexing the board
+    uses: [x, y] returns a Tile, and slices return a numpy array of Tiles.
+    """
+
+    def __init__(self, board):
+        self._board = board
+        self._tiles = weakref.WeakValueDictionary()  # (x, y) -> TileView still referenced somewhere
+        self.shape = (board.w, board.h)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for x in range(self.shape[0]):
+            yield self[x, :]
+
+    def __getitem__(self, key):
+        xKey, yKey = key
+        xs = range(self.shape[0])[xKey]  # range indexing mimics numpy: negative indexes, slices and IndexError
+        ys = range(self.shape[1])[yKey]
+        if isinstance(xs, int) and isinstance(ys, int):
+            return self.get_tile(xs, ys)
+        xRange = [xs] if isinstance(xs, int) else xs
+        yRange = [ys] if isinstance(ys, int) else ys
+        tiles = np.empty((len(xRange), len(yRange)), dtype=object)
+        for i, x in enumerate(xRange):
+            for j, y in enumerate(yRange):
+                tiles[i, j] = self.get_tile(x, y)
+        if isinstance(xs, int):
+            return tiles[0]
+        if isinstance(ys, int):
+            return tiles[:, 0]
+        return tiles
+
+    def get_tile(self, x, y):
+        tile = self._tiles.get((x, y))
+        if tile is None:
+            tile = self._board.Tile(x, y, self._board)
+            self._tiles[x, y] = tile
+        return tile
+
+    def transpose(self):
+        return self[:, :].transpose()
+
+
+class LazyTileMixin(object):
+    """ keeps board state in compact structures instead of in Tiles: cellStates for visibility and occupancy,
+    solidCells, and a dictionary of occupants. Tiles (which must be TileViews) are only created when addressed, such as
+    by board[x, y]. Mix in before a GameBoard class: class MyBoard(LazyTileMixin, GameBoard)
+
+    Attributes:
+        occupants: (x, y) -> player standing there
+    """
+
+    def setup(self, size=(9,9)):
+        self.occupants = dict()
+        super(LazyTileMixin, self).setup(size)
+
+    def create_tile_array(self, w, h):
+        return LazyTileArray(self)
+
+    def get_player_at(self, x, y):
+        return self.occupants.get((x, y))
+
+    def _store_visible(self, x, y, tf):
+        pass  # TileViews read visible from cellStates
+
+    def _store_solid(self, x, y, tf):
+        pass  # TileViews read solid from solidCells
 
 
 #=================================================================
@@ -209,6 +344,11 @@ class GameBoard(_RuleValidator):
         board:  The actual board: a numpy array of Tiles. the GameBoard class itself provides native get and set methods
                 so that you do not have to access board directly. Instead, just use gameboard[x, y].
         shape:  a numpy-style shape describing shape of gameboard.
+        cellStates: numpy array of GAP_STATE, TILE_STATE or PLAYER_STATE for each coordinate. Kept in step with the
+                Tiles by remove_at() and move_player(), so exporting the board never has to visit each Tile.
+        landableCounts: list holding, for each flat index x * h + y, the number of neighboring tiles a player
+                standing there could move to. Updated along with cellStates, so trap checks are a single lookup.
+        solidCells: set of (x, y) of Tiles that cannot be removed, kept by set_solid_at()
     """
     
     def to_number_grid(self, **kwargs):
@@ -218,14 +358,15 @@ class GameBoard(_RuleValidator):
         playerVal = float(kwargs.get('players', -1))  # allow overriding of default values
         tileVal = float(kwargs.get('tiles', 1))
         gapVal = float(kwargs.get('gaps', 0))
-        grid = np.zeros((self.w, self.h)) + gapVal
-        for x in range(self.w):
-            for y in range(self.h):
-                if self.board[x, y].player:
-                    grid[x, y] = playerVal
-                elif self.board[x, y].visible:
-                    grid[x, y] = tileVal
-        return grid
+        values = np.array([0.0] * 3)
+        values[self.GAP_STATE] = gapVal
+        values[self.TILE_STATE] = tileVal
+        values[self.PLAYER_STATE] = playerVal
+        return values[self.cellStates]  # relabel each cell state with its value, creating a new grid
 
     def __str__(self):
         return str(self.board.transpose())  # transpose because numpy's representation will show x/y reversed
+
+
+class LazyGameBoard(LazyTileMixin, GameBoard):
+    """ GameBoard creating Tiles only when they are addressed. See LazyTileMixin """
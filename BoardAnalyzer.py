@@ -1,7 +1,113 @@
-import numpy as np
+import itertools
 import random
-import scipy
-from scipy import signal
+import threading
+from collections import OrderedDict
+from BitBoard import get_shape_masks
+from Board import get_neighbor_indexes
+from LazyImport import lazy_import
+np = lazy_import('numpy')
+
+
+def neighbor_sum(grid):
+    """ return grid where each cell holds the sum of its 3x3 neighborhood (itself included), treating cells beyond
+    the border as zero. Same result as convolving with a 3x3 kernel of ones in 'same' mode, computed as separable
+    padded slice additions. Works on the last two axes, so a stack of grids can be summed at once
+    """
+    padded = np.zeros(grid.shape[:-2] + (grid.shape[-2] + 2, grid.shape[-1] + 2), dtype=grid.dtype)
+    padded[..., 1:-1, 1:-1] = grid
+    rows = padded[..., :-2, :] + padded[..., 1:-1, :] + padded[..., 2:, :]
+    return rows[..., :-2] + rows[..., 1:-1] + rows[..., 2:]
+
+
+def dilate(mask):
+    """ return copy of boolean mask grown by one cell in all 8 directions. Works on the last two axes, so a stack of
+    masks can be dilated at once
+    """
+    grown = mask.copy()
+    grown[..., 1:, :] |= mask[..., :-1, :]
+    grown[..., :-1, :] |= mask[..., 1:, :]
+    columns = grown.copy()
+    grown[..., :, 1:] |= columns[..., :, :-1]
+    grown[..., :, :-1] |= columns[..., :, 1:]
+    return grown
+
+
+def neighbor_max(grid):
+    """ return grid where each cell holds the largest value in its 3x3 neighborhood (itself included), treating cells
+    beyond the border as zero. Works on the last two axes, like neighbor_sum
+    """
+    padded = np.zeros(grid.shape[:-2] + (grid.shape[-2] + 2, grid.shape[-1] + 2), dtype=grid.dtype)
+    padded[..., 1:-1, 1:-1] = grid
+    rows = np.maximum(np.maximum(padded[..., :-2, :], padded[..., 1:-1, :]), padded[..., 2:, :])
+    return np.maximum(np.maximum(rows[..., :-2], rows[..., 1:-1]), rows[..., 2:])
+
+
+def label_regions(mask):
+    """ return integer grid labeling the connected regions of boolean mask (cells touching in any of 8 directions
+    share a region) 1, 2, 3..., with 0 wherever mask is False. Each cell starts with its own label (its flat index
+    plus one), and every cell takes the largest label around it until nothing changes. A label also names the cell it
+    came from, so each step a cell may jump to the label that cell has taken since, spreading labels across a region
+    in far fewer steps than its width
+    """
+    labels = np.where(mask, np.arange(1, mask.size + 1).reshape(mask.shape), 0)
+    while True:
+        grown = np.where(mask, neighbor_max(labels), 0)
+        grown = np.maximum(grown, grown.ravel()[grown - 1] * mask)  # label 0 reads a stray cell; masked away
+        if np.array_equal(grown, labels):
+            break
+        labels = grown
+    uniques, labels = np.unique(labels, return_inverse=True)  # renumber regions in order
+    if uniques[0] != 0:
+        labels += 1  # mask has no False cell to keep label 0
+    return labels.reshape(mask.shape)
+
+
+TIE = -1  # label_nearest label of cells equally near to more than one point
+UNREACHED = -2  # label_nearest label of cells no point reaches
+
+
+def label_nearest(passable, points):
+    """ expand from all points (a list of x, y) at once across boolean grid passable, labeling every cell with the
+    index in points of the point nearest to it, in moves of one cell in any of 8 directions. Cells equally near to
+    more than one point are labeled TIE, as is any cell only reached through such a cell, and cells no point reaches
+    are labeled UNREACHED. Return (labels, distances), where distances counts waves like MoveGrid.expand_from_points:
+    1 at the points, np.Inf where unreached.
+    Costs one wavefront expansion however many points there are: every cell holds the set of points nearest to it as
+    bits, and each wave a new cell takes the union of the sets on the frontier around it
+    """
+    dtype = np.int64 if len(points) < 63 else object  # python integers hold any number of bits
+    bits = np.zeros(passable.shape, dtype=dtype)
+    for i, (x, y) in enumerate(points):
+        bits[x, y] |= 1 << i
+    frontier = bits != 0
+    distances = np.empty(passable.shape)
+    distances.fill(np.Inf)
+    explored = frontier.copy()
+    wave = 1
+    while frontier.any():
+        distances[frontier] = wave
+        grown = dilate(bits * frontier)  # dilating integers ORs them, uniting the sets around each cell
+        frontier = (grown != 0) & passable & ~explored
+        bits[frontier] = grown[frontier]
+        explored |= frontier
+        wave += 1
+    labels = np.empty(passable.shape, dtype=int)
+    labels.fill(UNREACHED)
+    labels[explored] = TIE
+    single = explored & ((bits & (bits - 1)) == 0)  # exactly one bit set
+    if dtype is object:
+        labels[single] = [b.bit_length() - 1 for b in bits[single]]
+    else:
+        labels[single] = np.log2(bits[single]).astype(int)  # exact for powers of two
+    return labels, distances
+
+
+def iterate_bits(bits):
+    """ yield index of every bit set in integer bits, lowest first """
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
 
 
 class BaseGrid(object):
@@ -26,10 +132,7 @@ class BaseGrid(object):
     def set_gaps(self, grid):
         """ set passed grid to zero @ coordinates where original grid was zero """
         grid = grid.copy()
-        for x, col in enumerate(self.originalGrid):
-            for y, val in enumerate(col):
-                if val == self.GAP:
-                    grid[x, y] = self.GAP
+        grid[self.originalGrid == self.GAP] = self.GAP
         return grid
 
     def get_tile_neighbors_around_point(self, grid, x, y, includeValue=False):
@@ -75,10 +178,52 @@ class MoveGrid(BaseGrid):
         return grid
             
 
+    def get_passable_mask(self):
+        """ return boolean grid, True where original grid holds a tile that can be expanded into (not gap, not NaN) """
+        return (self.originalGrid != self.GAP) & ~np.isnan(self.originalGrid)
+
     def expand_from_points(self, grid, points):
         """ points should be a list of tuples, which indicate the starting points from which to expand.
         expand across board from starting points. Each expansion "wave" increments the value of the found points
         such that points further from starting points are greater in value. After expanding, any unreachable points
+        and gaps will contain the np.Inf vlaue, indicating they are invalid moves.
+        The whole frontier is expanded at once by dilating a boolean mask, so each wave costs a few array operations
+        """
+        frontier = np.zeros(grid.shape, dtype=bool)
+        for x, y in points:
+            frontier[x, y] = True
+        return self.expand_from_mask(frontier)
+
+    def expand_from_mask(self, frontier, passable=None):
+        """ expand across board like expand_from_points, starting from every point set in boolean array frontier.
+        frontier may also be a stack of masks, one per grid of a stacked original grid. passable, by default
+        get_passable_mask(), marks where the expansion may go; it may be a stack too, broadcasting against frontier
+        """
+        expanded = np.empty(frontier.shape)
+        expanded.fill(np.Inf)
+        if passable is None:
+            passable = self.get_passable_mask()
+        explored = frontier.copy()
+        wave = 1
+        while frontier.any():
+            expanded[frontier] = wave
+            frontier = dilate(frontier) & passable & ~explored
+            explored |= frontier
+            wave += 1
+        return expanded
+
+    def expand_labeled_from_points(self, grid, points):
+        """ expand across board from all points at once, like expand_from_points, also telling which point each
+        tile is nearest to. Return (labels, expanded): labels holds the index in points of the nearest point, TIE
+        where several points are equally near, and UNREACHED where none reaches. See label_nearest
+        """
+        return label_nearest(self.get_passable_mask(), points)
+
+    def _expand_from_points_pointwise(self, grid, points):
+        """ reference implementation of expand_from_points, expanding one point at a time. Kept for parity checks.
+        points should be a list of tuples, which indicate the starting points from which to expand.
+        expand across board from starting points. Each expansion "wave" increments the value of the found points
+        such that points further from starting points are greater in value. After expanding, any unreachable points
         and gaps will contain the np.Inf vlaue, indicating they are invalid moves
         """
         grid = grid.copy()  # make a copy, since we will be altering the grid
@@ -115,9 +260,7 @@ class AccessibleGrid(MoveGrid):
 class SweetSpotGrid(AccessibleGrid):
 
     def neighbor_convolve(self, grid):
-        neighborSumming = np.ones((3,3), dtype=np.int32)
-        neighborSummed = scipy.signal.convolve(grid, neighborSumming, mode='same')
-        return neighborSummed
+        return neighbor_sum(grid)
 
     def get_sweet_spots_from_point(self, grid, x, y):
         accessible = self.get_grid_accessible_from_point(grid, x, y)
@@ -131,10 +274,14 @@ class SweetSpotGrid(AccessibleGrid):
         sweetSpots = [(x, y) for x, y in arrayCoords]  # convert to usable list of tuple coordinates
         return sweetSpots
 
+    def get_move_grid_toward_sweet_spots(self, grid, x, y):
+        """ return grid of distances to the nearest sweet spot reachable from x, y """
+        sweetSpots = self.get_sweet_spots_from_point(grid, x, y)
+        return self.expand_from_points(grid, sweetSpots)
+
     def get_next_move_toward_sweet_spot(self, grid, x, y):
         """ find neighboring tile to x, y that moves in direction towards sweet spot """
-        sweetSpots = self.get_sweet_spots_from_point(grid, x, y)
-        moveGrid = self.expand_from_points(grid, sweetSpots)
+        moveGrid = self.get_move_grid_toward_sweet_spots(grid, x, y)
         neighbors = self.get_tile_neighbors_around_point(moveGrid, x, y, True)
         vMin, x, y = min(neighbors)
         bestMoves = [(x, y) for v, x, y in neighbors if v == vMin]
@@ -142,6 +289,392 @@ class SweetSpotGrid(AccessibleGrid):
         return x, y
 
 
+class BatchSweetSpotGrid(SweetSpotGrid):
+    """ SweetSpotGrid analyzing many positions at once. The original grid is a stack of grids with shape (n, w, h),
+    and methods take an (n, 2) array of x, y positions, one per grid. Every step (reachability, neighbor sums, gap
+    masking and expansion toward sweet spots) runs as array operations over the whole stack, so the cost per position
+    shrinks as the stack grows instead of being bound by python calls. Grids must share one shape.
+    """
+
+    @classmethod
+    def from_boards(cls, boards):
+        """ return batch analyzing the current state of every board in boards """
+        return cls(lambda **kwargs: np.array([board.to_number_grid(**kwargs) for board in boards]))
+
+    def get_position_mask(self, positions):
+        """ return boolean stack with only the position of each grid set """
+        positions = np.asarray(positions)
+        mask = np.zeros(self.originalGrid.shape, dtype=bool)
+        mask[np.arange(len(positions)), positions[:, 0], positions[:, 1]] = True
+        return mask
+
+    def get_grids_accessible_from_points(self, positions):
+        expanded = self.expand_from_mask(self.get_position_mask(positions))
+        accessible = expanded > 1  # see AccessibleGrid: excludes the position itself
+        return self.originalGrid * accessible
+
+    def get_sweet_spot_masks(self, positions):
+        """ return boolean stack marking the sweet spots of each grid, as reached from its position """
+        positions = np.asarray(positions)
+        accessible = self.get_grids_accessible_from_points(positions)
+        firstPass = self.set_gaps(self.neighbor_convolve(accessible))  # neighbor sums work on stacks of grids
+        secondPass = self.set_gaps(self.neighbor_convolve(firstPass))
+        secondPass[np.arange(len(positions)), positions[:, 0], positions[:, 1]] = 0  # never the starting point
+        return secondPass == secondPass.max(axis=(1, 2), keepdims=True)
+
+    def get_move_grids_toward_sweet_spots(self, positions):
+        """ return stack of grids of distances to the nearest sweet spot reachable from each position """
+        return self.expand_from_mask(self.get_sweet_spot_masks(positions))
+
+    def get_best_moves(self, positions):
+        """ return list holding, for each position, the list of neighboring tiles (as x, y) that lead fastest
+        toward a sweet spot. The list is empty if no neighboring tile is open
+        """
+        positions = np.asarray(positions)
+        moveGrids = self.get_move_grids_toward_sweet_spots(positions)
+        n, w, h = moveGrids.shape
+        padded = np.empty((n, w + 2, h + 2))
+        padded.fill(np.nan)  # NaN marks coordinates that are not candidates: off the board, or gaps
+        padded[:, 1:-1, 1:-1] = np.where(self.originalGrid == self.GAP, np.nan, moveGrids)
+        offsets = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy])
+        xs = positions[:, 0:1] + 1 + offsets[:, 0]  # (n, 8) padded coordinates of each position's neighbors
+        ys = positions[:, 1:2] + 1 + offsets[:, 1]
+        values = padded[np.arange(n)[:, None], xs, ys]
+        bestMoves = []
+        for layerValues, layerXs, layerYs in zip(values, xs.tolist(), ys.tolist()):
+            if np.isnan(layerValues).all():
+                bestMoves.append([])
+                continue
+            best = layerValues == np.nanmin(layerValues)
+            bestMoves.append([(x - 1, y - 1) for x, y, isBest in zip(layerXs, layerYs, best) if isBest])
+        return bestMoves
+
+    def get_next_moves_toward_sweet_spots(self, positions):
+        """ return list holding, for each position, x, y of a neighboring tile that moves toward a sweet spot, or
+        None if no neighboring tile is open
+        """
+        return [random.choice(moves) if moves else None for moves in self.get_best_moves(positions)]
+
+
+class RemovalGrid(MoveGrid):
+    """ scores every tile removal by how much it shrinks the regions players can still reach. A player's region is
+    the set of tiles reachable from its position (see MoveGrid); once regions stop overlapping, the board is
+    partitioned and each player plays alone in its own region.
+    Losses are found for all candidate removals together: one depth-first pass per player finds the tiles its region
+    hinges on (cut vertices, by Tarjan's algorithm), and how many tiles each would cut off, instead of expanding the
+    region again for every candidate.
+    """
+
+    def get_region_masks(self, positions, removals=None):
+        """ return boolean stack holding, for each x, y in positions, the tiles reachable from it (itself excluded).
+        Given removals, a list of x, y, return one such stack per removal instead: the regions as they would be once
+        that tile was removed. All are expanded together
+        """
+        passable = self.get_passable_mask()
+        if removals is not None:
+            xs, ys = np.array(removals, dtype=int).reshape(-1, 2).T
+            passable = np.repeat(passable[np.newaxis], len(removals), axis=0)
+            passable[np.arange(len(removals)), xs, ys] = False
+            passable = passable[:, np.newaxis]  # broadcasts over positions
+        frontier = np.zeros(passable.shape[:-3] + (len(positions),) + self.originalGrid.shape, dtype=bool)
+        for i, (x, y) in enumerate(positions):
+            frontier[..., i, x, y] = True
+        expanded = self.expand_from_mask(frontier, passable)
+        return (expanded > 1) & (expanded < np.Inf)
+
+    def is_partitioned(self, positions):
+        """ return True if no two players at positions can reach a common tile """
+        masks = self.get_region_masks(positions)
+        return not (masks.sum(axis=0) > 1).any()
+
+    def get_isolation_leads(self, positions, removals):
+        """ return array holding, for each x, y in removals, how many more tiles the player at positions[0] could
+        reach than any other player at positions once that tile was removed, or -np.Inf where it could still reach
+        a tile some other player can (the removal does not wall it off from everyone else)
+        """
+        leads = np.empty(len(removals))
+        leads.fill(-np.Inf)
+        losses = self.get_removal_losses(*positions[0])
+        cuts = [i for i, (x, y) in enumerate(removals) if losses[x, y] > 1]  # only cuts can wall a player off
+        if not cuts:
+            return leads
+        masks = self.get_region_masks(positions, [removals[i] for i in cuts])
+        sizes = masks.sum(axis=(2, 3))
+        cutLeads = (sizes[:, 0] - sizes[:, 1:].max(axis=1)).astype(float)
+        cutLeads[(masks[:, 0] & masks[:, 1:].any(axis=1)).any(axis=(1, 2))] = -np.Inf
+        leads[cuts] = cutLeads
+        return leads
+
+    def get_removal_losses(self, x, y):
+        """ return grid holding, for every tile reachable from x, y, how many tiles would no longer be reachable if
+        it were removed: the tile itself, plus any tiles that can only be reached through it. Zero elsewhere
+        """
+        w, h = self.originalGrid.shape
+        neighbors = get_neighbor_indexes(w, h)
+        passable = self.get_passable_mask().ravel().tolist()
+        root = x * h + y
+        passable[root] = True  # the player's own cell is not a tile, but paths back to it keep tiles connected
+        order = [0] * (w * h)  # discovery order, 0 while unvisited
+        low = [0] * (w * h)  # lowest discovery order reachable from a tile's subtree through one back edge
+        size = [0] * (w * h)  # tiles in subtree
+        lost = [0] * (w * h)
+        order[root] = low[root] = 1
+        count = 1
+        stack = [(root, 0)]
+        while stack:
+            v, i = stack[-1]
+            if i < len(neighbors[v]):
+                stack[-1] = (v, i + 1)
+                u = neighbors[v][i]
+                if not passable[u]:
+                    continue
+                if not order[u]:
+                    count += 1
+                    order[u] = low[u] = count
+                    size[u] = lost[u] = 1
+                    stack.append((u, 0))
+                elif order[u] < low[v]:
+                    low[v] = order[u]
+                continue
+            stack.pop()
+            if stack:
+                parent = stack[-1][0]
+                size[parent] += size[v]
+                low[parent] = min(low[parent], low[v])
+                if low[v] >= order[parent]:  # v's subtree hangs on parent alone
+                    lost[parent] += size[v]
+        lost[root] = 0
+        return np.array(lost, dtype=float).reshape(w, h)
+
+    def get_removal_scores(self, position, opponentPositions):
+        """ return grid scoring the removal of each tile: tiles cut from the regions of opponentPositions, minus
+        tiles cut from the region of position. Removing a tile shared by everyone usually scores 0; removing a tile
+        that splits an opponent's region off from a large area scores highly
+        """
+        scores = -self.get_removal_losses(*position)
+        for x, y in opponentPositions:
+            scores += self.get_removal_losses(x, y)
+        return scores
+
+
+class AnalysisCache(object):
+    """ bounded least-recently-used cache for analysis results. Once maxsize entries are held, storing a new entry
+    evicts the entry that was used longest ago. Safe to share between threads.
+
+    Attributes:
+        hits, misses, evictions: running counters, useful for sizing maxsize
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """ return cached value for key, or None if key is not cached """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        """ store value under key, evicting least recently used entries if cache is full """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ drop all entries and reset counters """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def get_stats(self):
+        """ return dictionary of cache counters and size """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+class CachedSweetSpotGrid(SweetSpotGrid):
+    """ SweetSpotGrid that memoizes sweet spots and move grids in a cache shared by all instances. Results are keyed
+    by a fingerprint of the board: its shape, the packed gap mask (other players are gaps in the grid), and the
+    position being analyzed. Only analysis of the original grid is cached; other grids are analyzed as usual.
+    """
+    cache = AnalysisCache(256)
+
+    def get_fingerprint(self, x, y):
+        """ return compact, hashable fingerprint of original grid and the x, y position being analyzed """
+        gapMask = np.packbits(self.originalGrid == self.GAP).tobytes()
+        return (self.originalGrid.shape, gapMask, int(x), int(y))
+
+    def get_sweet_spots_from_point(self, grid, x, y):
+        if grid is not self.originalGrid:
+            return super(CachedSweetSpotGrid, self).get_sweet_spots_from_point(grid, x, y)
+        key = ('sweetSpots',) + self.get_fingerprint(x, y)
+        sweetSpots = self.cache.get(key)
+        if sweetSpots is None:
+            sweetSpots = super(CachedSweetSpotGrid, self).get_sweet_spots_from_point(grid, x, y)
+            sweetSpots = tuple((int(x2), int(y2)) for x2, y2 in sweetSpots)
+            self.cache.put(key, sweetSpots)
+        return list(sweetSpots)
+
+    def get_move_grid_toward_sweet_spots(self, grid, x, y):
+        if grid is not self.originalGrid:
+            return super(CachedSweetSpotGrid, self).get_move_grid_toward_sweet_spots(grid, x, y)
+        key = ('moveGrid',) + self.get_fingerprint(x, y)
+        moveGrid = self.cache.get(key)
+        if moveGrid is None:
+            moveGrid = super(CachedSweetSpotGrid, self).get_move_grid_toward_sweet_spots(grid, x, y)
+            moveGrid.flags.writeable = False  # shared between callers, so guard against alteration
+            self.cache.put(key, moveGrid)
+        return moveGrid
+
+
+class PartitionGrid(BaseGrid):
+    """ finds the connected regions of the board. Players count as tiles here, since the tile a player stands on is
+    left behind when it moves. A player alone in its region is isolated: no opponent can ever reach it again, and
+    from then on they only meet through the tiles they remove from each other's regions
+    """
+    PLAYER = 1
+    cache = AnalysisCache(64)  # labels by mask. Moves leave the mask as is, so only removals need new labels
+
+    def __init__(self, grid_gen_fxn):
+        super(PartitionGrid, self).__init__(grid_gen_fxn)
+        mask = self.originalGrid != self.GAP
+        key = (mask.shape, np.packbits(mask).tobytes())
+        self.labels = self.cache.get(key)
+        if self.labels is None:
+            self.labels = label_regions(mask)
+            self.labels.flags.writeable = False  # shared between callers
+            self.cache.put(key, self.labels)
+
+    def is_isolated(self, position, positions):
+        """ return True if no other of positions (a list of x, y, which may include position itself) lies in the
+        region of position
+        """
+        label = self.labels[position]
+        return not any(self.labels[other] == label for other in positions if not tuple(other) == tuple(position))
+
+    def get_region_bits(self, x, y):
+        """ return integer with bit (x2 * h + y2) set for every cell in the region of x, y. Cells of players are
+        included, so clear those before counting on landing there
+        """
+        bits = 0
+        for i in np.flatnonzero(self.labels.ravel() == self.labels[x, y]).tolist():
+            bits |= 1 << i
+        return bits
+
+
+class EndgameSolver(object):
+    """ solves exactly how long an isolated player can survive in a small region. Positions are bit indexes
+    (x * h + y), and regions are integers with the bits of their tiles set (see BitBoard). Moving does not remove a
+    tile, so an isolated player is only trapped by the tiles its opponents remove from its region: the solver assumes
+    the worst, with every opponent spending its removals there (for two players that is exact, since removing a tile
+    from one's own region never helps). Results are memoized per board shape and kept between turns, so an endgame
+    is solved once and then looked up.
+
+    Attributes:
+        maxTiles: largest region worth solving. Cost grows exponentially with region size
+    """
+    maxTiles = 10
+    maxMemo = 500000
+    _memos = dict()  # (w, h) -> memo shared by every solver of the same shape
+
+    def __init__(self, w, h):
+        self.h = h
+        self.aroundMasks, self.neighborMasks = get_shape_masks(w, h)
+        self.memo = self._memos.setdefault((w, h), dict())
+        if len(self.memo) > self.maxMemo:
+            self.memo.clear()
+
+    def get_best_move(self, tiles, pos, removals=1):
+        """ return (bit index to move to, moves survived counting that one) for player at pos, facing removals tile
+        removals between its moves. Bit index is None if the player is trapped
+        """
+        tiles = self.get_component(tiles, pos)
+        best = (None, 0)
+        for target in iterate_bits(self.neighborMasks[pos] & tiles):
+            survival = 1 + self.get_survival(tiles, target, removals, removals)
+            if survival > best[1]:
+                best = (target, survival)
+        return best
+
+    def get_best_removal(self, tiles, pos, removals=1):
+        """ return (bit index to remove, moves the player at pos survives afterwards) from the region of player at
+        pos, which faces removals tile removals between its moves, this being the first. Bit index is None if there
+        is nothing to remove besides the player's own tile
+        """
+        tiles = self.get_component(tiles, pos)
+        best = (None, None)
+        for target in iterate_bits(tiles & ~(1 << pos)):
+            survival = self.get_survival(tiles & ~(1 << target), pos, removals - 1, removals)
+            if best[1] is None or survival < best[1]:
+                best = (target, survival)
+        return best
+
+    def get_survival(self, tiles, pos, left, removals):
+        """ return number of moves player at pos can still make, once left more tiles have been removed from tiles,
+        when removals tiles are removed between each of its moves
+        """
+        key = (tiles, pos, left, removals)
+        memo = self.memo
+        if key in memo:
+            return memo[key]
+        if left:
+            value = None
+            candidates = tiles & ~(1 << pos)
+            near = candidates & self.neighborMasks[pos]
+            for target in itertools.chain(iterate_bits(near), iterate_bits(candidates & ~near)):  # likely worst first
+                survival = self.get_survival(tiles & ~(1 << target), pos, left - 1, removals)
+                if value is None or survival < value:
+                    value = survival
+                    if not value:
+                        break
+            if value is None:
+                value = self.get_survival(tiles, pos, 0, removals)  # nothing left to remove
+        else:
+            tiles = self.get_component(tiles, pos)  # tiles that can no longer be reached do not matter
+            most = self.get_most_moves(tiles, removals)
+            value = 0
+            for target in iterate_bits(self.neighborMasks[pos] & tiles):
+                value = max(value, 1 + self.get_survival(tiles, target, removals, removals))
+                if value == most:
+                    break
+        memo[key] = value
+        return value
+
+    def get_most_moves(self, tiles, removals):
+        """ return upper bound on moves a player can make within component tiles (its own tile included): each move
+        needs a second tile, and removals tiles disappear after every move
+        """
+        count = bin(tiles).count('1')
+        return (count - 2) // removals + 1 if count > 1 else 0
+
+    def get_component(self, tiles, pos):
+        """ return bits of tiles reachable from pos, pos included """
+        neighborMasks = self.neighborMasks
+        region = frontier = 1 << pos
+        while frontier:
+            grown = 0
+            for i in iterate_bits(frontier):
+                grown |= neighborMasks[i]
+            frontier = grown & tiles & ~region
+            region |= frontier
+        return region
+
+
 if __name__ == '__main__':
     g = np.ones((5,5))
     g[1,2] = 0
@@ -164,4 +697,3 @@ if __name__ == '__main__':
     print(mg)
     x, y = ssg.get_next_move_toward_sweet_spot(g, x1, y1)
     print(x, y)
-    
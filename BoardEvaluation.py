@@ -0,0 +1,233 @@
+""" heuristics scoring how good a position is for one player, and a harness comparing them. Every heuristic takes grid,
+the number grid from GameBoard.to_number_grid() (gaps 0, tiles 1, players -1), positions, the x, y of every player
+still in the game, and seat, the index in positions of the player to score. It returns how far that player is ahead
+of its strongest opponent, so 0 is even and higher is better. Players of a position are scored together, in stacked
+array operations. Run directly to measure each heuristic's cost per call, and its win rate when an EvaluationBot
+plays by it:
+    python BoardEvaluation.py --games 100 --shape 7x6 --opponent MoveBot
+"""
+from __future__ import print_function
+import argparse
+import random
+from collections import OrderedDict
+from BoardAnalyzer import MoveGrid, label_nearest, neighbor_sum
+from RobotBoard import TileRemoveBot
+from LazyImport import lazy_import
+np = lazy_import('numpy')
+
+HEURISTICS = OrderedDict()  # name -> heuristic function
+
+
+def heuristic(fxn):
+    """ register heuristic under its function name """
+    HEURISTICS[fxn.__name__] = fxn
+    return fxn
+
+
+def get_lead(values, seat):
+    """ return values[seat] less the largest value of any other seat """
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return float(values[seat])
+    return float(values[seat] - np.delete(values, seat).max())
+
+
+def get_position_masks(shape, positions):
+    """ return boolean stack with one grid per position, holding only that position """
+    masks = np.zeros((len(positions),) + tuple(shape), dtype=bool)
+    for i, (x, y) in enumerate(positions):
+        masks[i, x, y] = True
+    return masks
+
+
+def get_distances(grid, positions):
+    """ return stack with one grid per position, holding the number of moves needed to reach each tile from that
+    position (np.Inf if it cannot be reached; 0 at the position itself). All positions expand in the same wavefront
+    """
+    mover = MoveGrid(lambda **values: grid)
+    expanded = mover.expand_from_mask(get_position_masks(grid.shape, positions), grid > 0)  # players block the way
+    return expanded - 1  # expand_from_mask counts the starting points as wave 1
+
+
+@heuristic
+def mobility(grid, positions, seat=0):
+    """ open tiles next to each player: the moves it has right now """
+    counts = neighbor_sum((grid > 0).astype(int))
+    xs, ys = zip(*positions)
+    return get_lead(counts[list(xs), list(ys)], seat)
+
+
+@heuristic
+def reachable_area(grid, positions, seat=0):
+    """ tiles each player could still walk to, if no more tiles were removed """
+    distances = get_distances(grid, positions)
+    return get_lead(((distances > 0) & (distances < np.Inf)).sum(axis=(1, 2)), seat)
+
+
+@heuristic
+def voronoi(grid, positions, seat=0):
+    """ tiles each player reaches in fewer moves than any opponent: its territory. Tiles reached first by several
+    players at once belong to nobody
+    """
+    labels, distances = label_nearest(grid > 0, positions)
+    owned = labels[(labels >= 0) & (distances > 1)]  # players' own cells are not territory
+    return get_lead(np.bincount(owned, minlength=len(positions)), seat)
+
+
+@heuristic
+def weighted_neighbor_sum(grid, positions, seat=0):
+    """ open tiles around each player, each weighted by the open tiles around it in turn. The measure MoveBot's
+    SweetSpotGrid maximizes, taken at the players themselves
+    """
+    tiles = (grid > 0).astype(float)
+    weighted = neighbor_sum(neighbor_sum(tiles) * tiles)
+    xs, ys = zip(*positions)
+    return get_lead(weighted[list(xs), list(ys)], seat)
+
+
+class EvaluationBot(TileRemoveBot):
+    """ EvaluationBot tries every move, and every removal next to a player, and takes whichever leaves the best
+    position according to its heuristic (one of HEURISTICS). Ties are broken at random. If nothing can be tried, it
+    falls back on TileRemoveBot
+    """
+    heuristic = staticmethod(mobility)
+
+    def get_position(self):
+        """ return (number grid, positions of live players, seat of this bot's player in positions) """
+        players = [player for player in self.board.players if not player.disabled or player == self.player]
+        return (self.board.to_number_grid(), [(player.x, player.y) for player in players],
+                players.index(self.player))
+
+    def take_move_player_turn(self, move_player_fxn):
+        grid, positions, seat = self.get_position()
+        scores = []
+        for tile in self.board.get_landable_tiles_around(self.player.x, self.player.y):
+            after = grid.copy()
+            after[self.player.x, self.player.y] = 1
+            after[tile.x, tile.y] = -1
+            positionsAfter = list(positions)
+            positionsAfter[seat] = (tile.x, tile.y)
+            scores.append((self.heuristic(after, positionsAfter, seat), tile))
+        if not scores:
+            super(EvaluationBot, self).take_move_player_turn(move_player_fxn)
+            return
+        target = self.pick_best(scores)
+        move_player_fxn(target.x, target.y)
+
+    def take_remove_tile_turn(self, remove_tile_fxn):
+        grid, positions, seat = self.get_position()
+        candidates = set()
+        for x, y in positions:
+            candidates.update(self.board.get_removable_tiles_around(x, y))
+        scores = []
+        for tile in candidates:
+            after = grid.copy()
+            after[tile.x, tile.y] = 0
+            scores.append((self.heuristic(after, positions, seat), tile))
+        if not scores:
+            super(EvaluationBot, self).take_remove_tile_turn(remove_tile_fxn)
+            return
+        target = self.pick_best(scores)
+        remove_tile_fxn(target.x, target.y)
+
+    def pick_best(self, scores):
+        """ return a random tile among the best scored in scores, a list of (score, tile) """
+        best = max(score for score, tile in scores)
+        return random.choice(sorted([tile for score, tile in scores if score == best], key=lambda t: (t.x, t.y)))
+
+
+class MobilityBot(EvaluationBot):
+    heuristic = staticmethod(mobility)
+
+
+class ReachableAreaBot(EvaluationBot):
+    heuristic = staticmethod(reachable_area)
+
+
+class VoronoiBot(EvaluationBot):
+    heuristic = staticmethod(voronoi)
+
+
+class NeighborSumBot(EvaluationBot):
+    heuristic = staticmethod(weighted_neighbor_sum)
+
+
+BOTS = OrderedDict([('mobility', MobilityBot), ('reachable_area', ReachableAreaBot), ('voronoi', VoronoiBot),
+                    ('weighted_neighbor_sum', NeighborSumBot)])  # heuristic name -> bot playing by it
+
+
+def make_positions(shape, numPositions=20, numPlayers=2, seed=0):
+    """ return list of (grid, positions) taken from random games, each some way into the game """
+    from BitBoard import BitGame
+    rand = random.Random(seed)
+    samples = []
+    while len(samples) < numPositions:
+        game = BitGame()
+        game.setup(numPlayers, shape)
+        plies = rand.randrange(2 * shape[0] * shape[1] // 3)
+        for ply in range(plies):
+            if game.turnType == game.GAME_OVER:
+                break
+            player = game.get_active_player()
+            if game.turnType == game.MOVE_PLAYER:
+                tile = rand.choice(game.board.get_landable_tiles_around(player.x, player.y))
+                game.player_moves_player(tile.x, tile.y)
+            else:
+                tile = rand.choice(game.board.get_all_open_removable_tiles())
+                game.player_removes_tile(tile.x, tile.y)
+        if game.turnType == game.GAME_OVER:
+            continue
+        players = [player for player in game.board.players if not player.disabled]
+        samples.append((game.board.to_number_grid(), [(player.x, player.y) for player in players]))
+    return samples
+
+
+def time_heuristics(samples, names=None, minTime=0.2):
+    """ return dictionary of heuristic name -> best seconds per call, averaged over samples from make_positions """
+    from Benchmark import time_call
+    timings = OrderedDict()
+    for name in names or HEURISTICS:
+        fxn = HEURISTICS[name]
+
+        def run():
+            for grid, positions in samples:
+                fxn(grid, positions, 0)
+        timings[name] = time_call(run, minTime) / len(samples)
+    return timings
+
+
+def measure_win_rates(opponent, numGames=100, shape=(7, 6), names=None, processes=None, seed=0):
+    """ return dictionary of heuristic name -> simulate() summary of its EvaluationBot playing numGames against
+    opponent, a robot class
+    """
+    from Simulator import simulate
+    return OrderedDict((name, simulate([BOTS[name], opponent], numGames, shape, processes, seed))
+                       for name in names or BOTS)
+
+
+def main(argv=None):
+    from Simulator import BOTS as OPPONENTS
+    parser = argparse.ArgumentParser(description="measure each heuristic's cost per call and win rate")
+    parser.add_argument('--games', type=int, default=100, help='games per heuristic. 0 only measures cost')
+    parser.add_argument('--shape', default='7x6', help='board width x height, like 7x6')
+    parser.add_argument('--opponent', default='MoveBot', choices=sorted(OPPONENTS))
+    parser.add_argument('--heuristics', nargs='+', default=list(HEURISTICS), choices=list(HEURISTICS))
+    parser.add_argument('--processes', type=int, default=None, help='worker processes. Default uses every core')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    shape = tuple(int(n) for n in args.shape.lower().split('x'))
+    timings = time_heuristics(make_positions(shape, seed=args.seed), args.heuristics)
+    summaries = dict()
+    if args.games:
+        summaries = measure_win_rates(OPPONENTS[args.opponent], args.games, shape, args.heuristics, args.processes,
+                                      args.seed)
+    print('heuristic'.ljust(24) + 'us/call'.rjust(10) + ('win rate vs ' + args.opponent).rjust(28))
+    for name in args.heuristics:
+        line = name.ljust(24) + str(round(timings[name] * 1e6, 1)).rjust(10)
+        if name in summaries:
+            line += str(round(summaries[name]['winRateByBot'][BOTS[name].__name__], 3)).rjust(28)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,12 @@
-import numpy as np
 import math
-from Board import GameBoard
+from Board import GameBoard, LazyGameBoard
 
 
-class Tile:
-    """ A GameBoard is composed of rows and columns of Tiles. Each Tile has a specific x and y coordinate. It is up to
-    the GameBoard setup to ensure a Tile has the correct x and y coordinates. When a Tile is NOT visible, it is
-    considered removed from the Board, and can not be occupied by a Player.
-    Tiles are considered "Landable" if a player can move onto it. "Removable" indicates the tile can be removed
-
-    :Attributes
-        visible: if the Tile has not been removed from the GameBoard. True=> NOT removed. False=> REMOVED FROM BOARD
-        solid: specifies if Tile is removable. If True, Tile cannot be removed
-        player: reference to player token. player = None if Tile is unoccupied. When checking if a player occupies a
-            particular Tile, use player == tile, or player in board[i, j] also works
+class _TileBehavior(object):
+    """ behavior shared by Tile, SlotTile and TileView. Holds no attributes of its own, so that slotted subclasses
+    stay slotted
     """
-
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.visible = True
-        self.solid = False
-        self.player = None
+    __slots__ = ()
 
     def __repr__(self):
         pos = str(self.x) + ',' + str(self.y)
@@ -44,14 +29,83 @@ class Tile:
         """ must define a hash method if you override __eq__ in python 3. Hashing allows sets to hold tiles """
         return id(self)
 
-    def set_visible(self, tf):
-        """
-        :param tf: boolean True or False to set visible attribute.
+
+class Tile(_TileBehavior):
+    """ A GameBoard is composed of rows and columns of Tiles. Each Tile has a specific x and y coordinate. It is up to
+    the GameBoard setup to ensure a Tile has the correct x and y coordinates. When a Tile is NOT visible, it is
+    considered removed from the Board, and can not be occupied by a Player.
+    Tiles are considered "Landable" if a player can move onto it. "Removable" indicates the tile can be removed.
+    visible and solid are kept by the board: change them through GameBoard.remove_at, restore_at and set_solid_at,
+    which also keep the board's cellStates and landableCounts (and a BitBoard's bits) in step
+
+    :Attributes
+        visible: if the Tile has not been removed from the GameBoard. True=> NOT removed. False=> REMOVED FROM BOARD
+        solid: specifies if Tile is removable. If True, Tile cannot be removed
+        player: reference to player token. player = None if Tile is unoccupied. When checking if a player occupies a
+            particular Tile, use player == tile, or player in board[i, j] also works
+    """
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.visible = True
+        self.solid = False
+        self.player = None
+
+
+class SlotTile(_TileBehavior):
+    """ Tile without a per-instance __dict__, for boards holding many tiles. New attributes cannot be added to it """
+    __slots__ = ('x', 'y', 'visible', 'solid', 'player')
+    __init__ = Tile.__init__
+
+
+class TileView(_TileBehavior):
+    """ Tile holding no state of its own. visible, solid and player are read from the board's state (player is also
+    written to it), so a board can create TileViews only when they are addressed and let them go afterwards. visible
+    and solid are read-only; change them through the board, like any Tile's. See LazyTileMixin
+    """
+    __slots__ = ('x', 'y', 'board', '__weakref__')
+
+    def __init__(self, x, y, board):
+        self.x = x
+        self.y = y
+        self.board = board
+
+    @property
+    def visible(self):
+        return not self.board.cellStates[self.x, self.y] == self.board.GAP_STATE
+
+    @property
+    def solid(self):
+        return (self.x, self.y) in self.board.solidCells
+
+    @property
+    def player(self):
+        return self.board.occupants.get((self.x, self.y))
+
+    @player.setter
+    def player(self, player):
+        if player is None:
+            self.board.occupants.pop((self.x, self.y), None)
+        else:
+            self.board.occupants[self.x, self.y] = player
+
+
+class _PlayerBehavior(object):
+    """ behavior shared by Player and SlotPlayer """
+    __slots__ = ()
+    _colors = [("#FF0000", "Red"), ("#0000FF", "Blue"), ("#00FF00", "Green"),
+               ("#FF00FF", "Purple"), ("#00FFFF", "Cyan"), ("#FFFF00", "Yellow")]
+
+    def move_to(self, x, y):
+        """ reassigns coordinates. Because it does not reassign player to Tile, this funciton should only be called by
+        board's move_to() function
         """
-        self.visible = tf
+        self.x = x
+        self.y = y
 
 
-class Player:
+class Player(_PlayerBehavior):
     """ Player is moved around the board, and is trapped once it cannot move on it's own turn.
 
     Attributes:
@@ -62,25 +116,22 @@ class Player:
             player will remain inactive for the rest of the game.
         humanControlled: set to False if a robot is expected to control this Player Token's turn.
     """
-    _colors = [("#FF0000", "Red"), ("#0000FF", "Blue"), ("#00FF00", "Green"),
-               ("#FF00FF", "Purple"), ("#00FFFF", "Cyan"), ("#FFFF00", "Yellow")]
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.color, self.colorName = self._colors.pop(0)
-        self._colors.append(self.color)  # put first color at end of class-wide list -> so next instance gets new color
+        self._colors.append((self.color, self.colorName))  # put first color at end of class-wide list -> so next instance gets new color
         self.disabled = False
         self.active = False  # for determining style. Game will set Player's currentPlayer to True when it has turn
         self.humanControlled = True  # for determining which Players are robots / AI controlled
 
-    def move_to(self, x, y):
-        """ reassigns coordinates. Because it does not reassign player to Tile, this funciton should only be called by
-        board's move_to() function
-        """
-        self.x = x
-        self.y = y
-        
+
+class SlotPlayer(_PlayerBehavior):
+    """ Player without a per-instance __dict__ """
+    __slots__ = ('x', 'y', 'color', 'colorName', 'disabled', 'active', 'humanControlled')
+    __init__ = Player.__init__
+
 
 class BoardExporter:
     """ allow exporting board to grid. Copies all relevant data from the board and then gives access to analyzing functions
@@ -119,6 +170,12 @@ class Game:
         turnSuccessful: True or False if the last command (to move player or remove tile) was valid and executed
         turnType: type of turn, REMOVE_TILE or MOVE_PLAYER, or GAME_OVER
         board: reference to the gameboard.
+        moveStack: record of every action made, most recent last. Each record holds what unmake() needs to take the
+            action back: (turnType, x, y, fromX, fromY, players, disabled), where fromX, fromY is where a moved player
+            came from (None for tile removes), and players and disabled are the player order and disabled flags
+            before the action
+        redoStack: (x, y) of actions taken back by undo(), most recently undone last. Cleared by any new action
+        recorder: None, or object told of every action played, undone and redone (see GameRecord.record_game)
     """
     REMOVE_TILE = 5
     MOVE_PLAYER = 6
@@ -128,6 +185,7 @@ class Game:
     Tile = Tile
     turnSuccessful = False  # a status indicator only.
     turnType = None
+    recorder = None
 
     def setup(self, numPlayers=2, shape=(9,9)):
         """ set up board shape and populate players, set active player. After this, game will be ready to play """
@@ -138,6 +196,8 @@ class Game:
         self.board.add_players(numPlayers)
         self.turnType = self.MOVE_PLAYER  # first player's turn is to move
         self.get_active_player().active = True
+        self.moveStack = []
+        self.redoStack = []
     
     def get_active_player(self):
         """ return player who has "control" of current turn """
@@ -184,23 +244,97 @@ class Game:
 
     def player_removes_tile(self, x, y):
         """ take turn on game by removing tile. Checks that turn is valid, and afterwards rolls over to next turn """
-        if self.turnType == self.REMOVE_TILE and self.board.is_valid_tile_remove(x, y):
-            self.board.remove_at(x, y)
-            self.setup_next_turn()
-            self.turnSuccessful = True
+        if self.board.out_of_bounds(x, y):
+            self.turnSuccessful = False
+        elif self.turnType == self.REMOVE_TILE and self.board.is_valid_tile_remove(x, y):
+            self.make(x, y)
+            del self.redoStack[:]
+            if self.recorder is not None:
+                self.recorder.write_remove(x, y)
         else:
             self.turnSuccessful = False
 
     def player_moves_player(self, x, y):
         """ take turn on game by moving player. Checks that turn is valid, and afterwards rolls over to next turn """
         player = self.get_active_player()
-        if self.turnType == self.MOVE_PLAYER and self.board.is_valid_player_move(player, x, y):
-            self.board.move_player(player, x, y)
-            self.setup_next_turn()
-            self.turnSuccessful = True
+        if self.board.out_of_bounds(x, y):
+            self.turnSuccessful = False
+        elif self.turnType == self.MOVE_PLAYER and self.board.is_valid_player_move(player, x, y):
+            self.make(x, y)
+            del self.redoStack[:]
+            if self.recorder is not None:
+                self.recorder.write_move(x, y)
         else:
             self.turnSuccessful = False
 
+    def make(self, x, y):
+        """ carry out current turn at x, y (move active player there, or remove tile there) and roll over to next
+        turn, recording how to take it back on moveStack. The action is NOT checked for validity: search code that
+        already knows its actions are valid can call make() and unmake() directly. Returns the record
+        """
+        board = self.board
+        players = board.players
+        disabled = tuple([p.disabled for p in players])
+        if self.turnType == self.MOVE_PLAYER:
+            player = players[0]
+            record = (self.turnType, x, y, player.x, player.y, tuple(players), disabled)
+            board.move_player(player, x, y)
+        else:
+            record = (self.turnType, x, y, None, None, tuple(players), disabled)
+            board.remove_at(x, y)
+        self.moveStack.append(record)
+        self.setup_next_turn()
+        self.turnSuccessful = True
+        return record
+
+    def unmake(self):
+        """ take back the last action made, restoring board, turn type, player order and disabled flags. Returns the
+        record of the action taken back
+        """
+        turnType, x, y, fromX, fromY, players, disabled = record = self.moveStack.pop()
+        board = self.board
+        board.players[:] = players
+        for player, tf in zip(players, disabled):
+            player.disabled = tf
+            player.active = False
+        players[0].active = True
+        if turnType == self.MOVE_PLAYER:
+            board.move_player(players[0], fromX, fromY)
+        else:
+            board.restore_at(x, y)
+        self.turnType = turnType
+        self.turnSuccessful = True
+        return record
+
+    def undo(self):
+        """ take back the last action, keeping it for redo(). Return False if there is nothing to undo """
+        if not self.moveStack:
+            return False
+        record = self.unmake()
+        self.redoStack.append(record[1:3])
+        if self.recorder is not None:
+            self.recorder.write_undo()
+        return True
+
+    def redo(self):
+        """ carry out again the last action taken back by undo(). Return False if there is nothing to redo """
+        if not self.redoStack:
+            return False
+        self.make(*self.redoStack.pop())
+        if self.recorder is not None:
+            self.recorder.write_redo()
+        return True
+
+
+class LazyGame(Game):
+    """ Game keeping its board in compact arrays, creating Tiles only when they are addressed. Uses less memory when
+    many games are held at once, but rules that walk tiles create a TileView for every tile they address, so playing
+    is slower: about 5x slower than Game for random play on a 7x6 board
+    """
+    GameBoard = LazyGameBoard
+    Player = SlotPlayer
+    Tile = TileView
+
 
 # only run this code if run directly, NOT imported
 if __name__ == '__main__':
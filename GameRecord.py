@@ -0,0 +1,177 @@
+""" compact, append-only log of played games, and fast replay of any logged position. A log holds any number of games
+back to back. Each game is a setup record followed by one record per action, all little-endian:
+    setup:  'G', format version, width, height, number of players, bitmask of robot seats, seed (-1 if unknown)
+    action: MOVE, REMOVE, UNDO or REDO, x, y    (5 bytes)
+Record a game by attaching a writer to it, then play as usual:
+    with open('games.log', 'ab') as f:
+        record_game(game, f, seed)
+        ...
+Replay any game up to any ply (number of actions), without any html:
+    with open('games.log', 'rb') as f:
+        game = read_games(f)[3].replay(ply=10)
+Run directly to print a logged position:
+    python GameRecord.py games.log --game 3 --ply 10
+"""
+from __future__ import print_function
+import argparse
+import struct
+from BitBoard import BitGame
+
+VERSION = 1
+GAME = ord('G')
+MOVE = 1
+REMOVE = 2
+UNDO = 3
+REDO = 4
+_setupFormat = struct.Struct('<BBHHBIq')  # tag, version, w, h, number of players, robot seats, seed
+_actionFormat = struct.Struct('<BHH')  # tag, x, y
+
+
+class GameRecordWriter(object):
+    """ appends the records of one game to a binary stream while the game is played. The game calls write_move,
+    write_remove, write_undo and write_redo through its recorder attribute; see record_game
+
+    Attributes:
+        stream: binary file-like object records are written to
+        autoFlush: if True, stream is flushed after every record, so the log can be read while the game goes on
+    """
+
+    def __init__(self, stream, autoFlush=False):
+        self.stream = stream
+        self.autoFlush = autoFlush
+
+    def write_setup(self, shape, numPlayers, robotSeats=0, seed=None):
+        """ start a new game in the log. robotSeats has bit i set if the player in seat i is a robot """
+        w, h = shape
+        self._write(_setupFormat.pack(GAME, VERSION, w, h, numPlayers, robotSeats, -1 if seed is None else seed))
+
+    def write_move(self, x, y):
+        self._write(_actionFormat.pack(MOVE, x, y))
+
+    def write_remove(self, x, y):
+        self._write(_actionFormat.pack(REMOVE, x, y))
+
+    def write_undo(self):
+        self._write(_actionFormat.pack(UNDO, 0, 0))
+
+    def write_redo(self):
+        self._write(_actionFormat.pack(REDO, 0, 0))
+
+    def _write(self, data):
+        self.stream.write(data)
+        if self.autoFlush:
+            self.stream.flush()
+
+
+def record_game(game, stream, seed=None, autoFlush=False):
+    """ log game to stream from now on: write its setup, then attach a GameRecordWriter as game's recorder so every
+    action taken is appended. Actions already taken are written first, so a game may be recorded at any point.
+    Return the writer
+    """
+    board = game.board
+    seats = game.moveStack[0][5] if game.moveStack else board.players  # seat order before the first action
+    robotSeats = sum(1 << seat for seat, player in enumerate(seats) if not player.humanControlled)
+    writer = GameRecordWriter(stream, autoFlush)
+    writer.write_setup((board.w, board.h), len(seats), robotSeats, seed)
+    for record in game.moveStack:
+        turnType, x, y = record[:3]
+        if turnType == game.MOVE_PLAYER:
+            writer.write_move(x, y)
+        else:
+            writer.write_remove(x, y)
+    game.recorder = writer
+    return writer
+
+
+class GameLog(object):
+    """ one game read back from a log
+
+    Attributes:
+        shape: (w, h) of the board
+        numPlayers: number of players, robots included
+        robotSeats: bitmask with bit i set if the player in seat i is a robot
+        seed: seed the game was played with, or None if unknown
+        actions: list of (tag, x, y), one per ply
+    """
+
+    def __init__(self, shape, numPlayers, robotSeats=0, seed=None, actions=None):
+        self.shape = shape
+        self.numPlayers = numPlayers
+        self.robotSeats = robotSeats
+        self.seed = seed
+        self.actions = actions or []
+
+    def __len__(self):
+        return len(self.actions)
+
+    def replay(self, ply=None, Game=BitGame):
+        """ return game of class Game set up as logged, with the first ply actions applied (all if ply is None).
+        Actions were checked when they were played, so they are applied with make(), undo() and redo() without being
+        validated again. Players in robot seats are not human controlled, but no robots are attached to them
+        """
+        game = Game()
+        game.setup(self.numPlayers, self.shape)
+        for seat, player in enumerate(game.board.players):
+            player.humanControlled = not (self.robotSeats >> seat) & 1
+        for tag, x, y in self.actions[:ply]:
+            if tag == UNDO:
+                game.undo()
+            elif tag == REDO:
+                game.redo()
+            elif (tag == MOVE) == (game.turnType == game.MOVE_PLAYER) and not game.turnType == game.GAME_OVER:
+                game.make(x, y)
+                del game.redoStack[:]
+            else:
+                raise ValueError('logged action does not fit the turn being played')
+        return game
+
+
+def read_games(stream):
+    """ return list of GameLog for every game in binary stream. A game cut short by a writer that is still running
+    (or that crashed) is returned with the actions written so far
+    """
+    data = stream.read()
+    games = []
+    log = None
+    offset = 0
+    end = len(data)
+    while offset < end:
+        if data[offset:offset + 1] == b'G':
+            if offset + _setupFormat.size > end:
+                break
+            tag, version, w, h, numPlayers, robotSeats, seed = _setupFormat.unpack_from(data, offset)
+            if version > VERSION:
+                raise ValueError('game log version ' + str(version) + ' is newer than this reader')
+            log = GameLog((w, h), numPlayers, robotSeats, None if seed == -1 else seed)
+            games.append(log)
+            offset += _setupFormat.size
+        else:
+            if offset + _actionFormat.size > end:
+                break
+            if log is None:
+                raise ValueError('game log does not start with a setup record')
+            log.actions.append(_actionFormat.unpack_from(data, offset))
+            offset += _actionFormat.size
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description='print a position from a game log')
+    parser.add_argument('path')
+    parser.add_argument('--game', type=int, default=0, help='index of game in log')
+    parser.add_argument('--ply', type=int, default=None, help='number of actions to replay. Default replays all')
+    args = parser.parse_args()
+    with open(args.path, 'rb') as f:
+        games = read_games(f)
+    log = games[args.game]
+    game = log.replay(args.ply)
+    print(str(len(games)) + ' games in log. Game ' + str(args.game) + ' has ' + str(len(log)) + ' plies, seed ' +
+          str(log.seed))
+    print(game.board.to_number_grid().transpose())
+    player = game.get_active_player()
+    turnNames = {game.MOVE_PLAYER: 'move', game.REMOVE_TILE: 'remove', game.GAME_OVER: 'game over'}
+    print('turn: ' + turnNames[game.turnType] + ', active player at ' + str(player.x) + ',' + str(player.y))
+
+
+if __name__ == '__main__':
+    main()
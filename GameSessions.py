@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class GameSession(object):
+    """ one hosted game. Hold lock while reading or changing the game, so that requests on the same game are handled
+    one at a time, while requests on other games carry on in parallel.
+
+    Attributes:
+        gameId: key of the session in its GameRegistry
+        game: the hosted game
+        lock: re-entrant lock guarding game
+        lastUsed: time.time() of the last lookup of this session
+        robotJob: robot turn being decided in the background for this game, if any. See RobotDispatcher
+    """
+
+    def __init__(self, gameId, game):
+        self.gameId = gameId
+        self.game = game
+        self.lock = threading.RLock()
+        self.lastUsed = time.time()
+        self.robotJob = None
+
+
+class GameRegistry(object):
+    """ holds many games, each under its own game id. Games unused for longer than ttl seconds are evicted, and once
+    more than maxGames are held the least recently used game is evicted, so memory stays bounded.
+
+    Attributes:
+        game_factory: function called with keyword arguments given to create(), returning a set-up game
+        maxGames: most games held at once
+        ttl: seconds a game may sit unused before it is evicted
+        evictions: running count of evicted games
+    """
+    Session = GameSession
+
+    def __init__(self, game_factory, maxGames=500, ttl=3600):
+        self.game_factory = game_factory
+        self.maxGames = maxGames
+        self.ttl = ttl
+        self.evictions = 0
+        self._sessions = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()  # guards _sessions only. Never held while a game is being played
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, gameId):
+        return gameId in self._sessions
+
+    def create(self, **kwargs):
+        """ create game with game_factory(**kwargs) and register it under a new, unguessable game id. Return session """
+        game = self.game_factory(**kwargs)
+        session = self.Session(uuid.uuid4().hex, game)
+        with self._lock:
+            self._sessions[session.gameId] = session
+            self._evict(time.time())
+        return session
+
+    def get(self, gameId):
+        """ return session of gameId, marking it as recently used. Return None if no such game is held """
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(gameId)
+            if session is None:
+                return None
+            session.lastUsed = now
+            self._sessions.move_to_end(gameId)
+            return session
+
+    def remove(self, gameId):
+        """ stop hosting gameId. Return True if it was held """
+        with self._lock:
+            return self._sessions.pop(gameId, None) is not None
+
+    def evict_idle(self):
+        """ evict games that have been unused for longer than ttl """
+        with self._lock:
+            self._evict(time.time())
+
+    def _evict(self, now):
+        sessions = self._sessions
+        while sessions:
+            gameId, session = next(iter(sessions.items()))
+            if len(sessions) > self.maxGames or now - session.lastUsed > self.ttl:
+                sessions.popitem(last=False)
+                self.evictions += 1
+            else:
+                break  # sessions are ordered by last use, so the rest are newer
@@ -1,5 +1,7 @@
 from __future__ import print_function
-import numpy as np
+from BoardAnalyzer import dilate
+from LazyImport import lazy_import
+np = lazy_import('numpy')
 
 
 class Grid:
@@ -86,31 +88,25 @@ class Grid:
                 tiles.add(pt)
         return tiles
 
-    def get_visible_edge_tile_points(self):
-        edges = set()
-        w, h = self.shape
-        y = 0
-        top = [self.Point(x, y) for x in range(w) if self[self.Point(x, y)] == self.TILE]
-        y = h - 1
-        bottom = [self.Point(x, y) for x in range(w) if self[self.Point(x, y)] == self.TILE]
-        x = 0
-        left = [self.Point(x, y) for y in range(h) if self[self.Point(x, y)] == self.TILE]
-        x = w - 1
-        right = [self.Point(x, y) for y in range(h) if self[self.Point(x, y)] == self.TILE]
-        for pt in left + right + top + bottom:
-            edges.add(pt)
-        return edges
-
-    def get_points_neighboring_gaps(self):
-        allNeighbors = set()
-        w, h = self.shape
-        for x in range(w):
-            for y in range(h):
-                pt = self.Point(x, y)
-                if self[pt] == self.GAP:  # we found a gap
-                    nearbyToGap = self.get_visible_tile_points_around_point(pt)
-                    allNeighbors = allNeighbors.union(nearbyToGap)
-        return allNeighbors
+    def get_points_from_mask(self, mask, raw=False):
+        """ return set of Points where boolean array mask is True. If raw is True, skip creating Points and return
+        (n, 2) integer array of x, y coordinates instead, in x-major order
+        """
+        coordinates = np.argwhere(mask)
+        if raw:
+            return coordinates
+        Point = self.Point
+        return set([Point(x, y) for x, y in coordinates.tolist()])
+
+    def get_visible_edge_tile_points(self, raw=False):
+        edges = np.ones(self.grid.shape, dtype=bool)
+        edges[1:-1, 1:-1] = False  # keep only the outermost rows and columns
+        return self.get_points_from_mask(edges & (self.grid == self.TILE), raw)
+
+    def get_points_neighboring_gaps(self, raw=False):
+        """ return tile points (players excluded) that have a gap among their 8 neighbors """
+        nearGaps = dilate(self.grid == self.GAP)  # grows onto the gaps themselves too, which are no tiles
+        return self.get_points_from_mask(nearGaps & (self.grid == self.TILE), raw)
 
     def set_player_points(self, points):
         for pt in points:
@@ -120,24 +116,17 @@ class Grid:
         for pt in points:
             self[pt] = self.GAP
 
-    def get_points_of_type(self, ptype):
-        pts = set()
-        w, h = self.shape
-        for x in range(w):
-            for y in range(h):
-                pt = self.Point(x, y)
-                if self[pt] == ptype:
-                    pts.add(pt)
-        return pts
+    def get_points_of_type(self, ptype, raw=False):
+        return self.get_points_from_mask(self.grid == ptype, raw)
 
-    def get_player_points(self):
-        return self.get_points_of_type(self.PLAYER)
+    def get_player_points(self, raw=False):
+        return self.get_points_of_type(self.PLAYER, raw)
 
-    def get_tile_points(self):
-        return self.get_points_of_type(self.TILE)
+    def get_tile_points(self, raw=False):
+        return self.get_points_of_type(self.TILE, raw)
 
-    def get_gap_points(self):
-        return self.get_points_of_type(self.GAP)
+    def get_gap_points(self, raw=False):
+        return self.get_points_of_type(self.GAP, raw)
 
     def point_contains_type(self, pt, ptype):
         if self.out_of_bounds(pt):
@@ -153,12 +142,14 @@ class Grid:
     def contains_gap(self, pt):
         return self.point_contains_type(pt, self.GAP)
 
-    def get_first_highest_value_point(self):
-        maxval = self.grid.max()
-        for x in range(self.w):
-            for y in range(self.h):
-                if self[self.Point(x, y)] == maxval:
-                    return self.Point(x,y)
+    def get_first_highest_value_point(self, raw=False):
+        """ return Point holding the highest value, the first one in x-major order on ties. If raw is True, return
+        (x, y) tuple instead
+        """
+        x, y = np.unravel_index(np.argmax(self.grid), self.grid.shape)
+        if raw:
+            return int(x), int(y)
+        return self.Point(int(x), int(y))
 
         
 if __name__ == '__main__':
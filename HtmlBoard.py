@@ -1,27 +1,32 @@
-from Game import Tile, Player
+import json
+from Game import Tile, Player, SlotTile, SlotPlayer, TileView
+from Board import LazyTileMixin
 from RobotBoard import RobotGame, RobotGameBoard
+from BitBoard import BitBoardMixin
 
-class HtmlTile(Tile):
-    """ Provides export-to-html functionality on top of the traditional Tile class. For each tile, you'll need to save
-    The Tile's html. Only once do you need to get the tile's style. If you want to include a link on the Tile, set
-    tile's link attribute to desired link, and then call get_html
-    """
-    link = None
+def get_tile_html(visible, player, link):
+    """ return html of a tile, visible or removed, holding player (or None) and linking to link (or None) """
+    if visible:
+        visibility = 'visible'
+    else:
+        visibility = 'hidden'
+    html = '<div class="tile ' + visibility  + '">'  # build html representing tile
+    if visible and not player:  # do not allow clicking on tile if it's removed or player occupied
+        if link:
+            html += '<a href="' + link + '" class="tile-link"></a>'
+    if player:
+        html += player.get_html()
+    html += '</div>'
+    return html
 
-    def get_html(self):
-        """ export tile state to html """
-        if self.visible:
-            visibility = 'visible'
-        else:
-            visibility = 'hidden'
-        html = '<div class="tile ' + visibility  + '">'  # build html representing tile
-        if self.visible and not self.player:  # do not allow clicking on tile if it's removed or player occupied
-            if self.link:
-                html += '<a href="' + self.link + '" class="tile-link"></a>'
-        if self.player:
-            html += self.player.get_html()
-        html += '</div>'
-        return html
+
+class _HtmlTileBehavior(object):
+    """ html export shared by HtmlTile, SlotHtmlTile and HtmlTileView """
+    __slots__ = ()
+
+    def get_html(self, link=None):
+        """ export tile state to html. link, if given, is used instead of the tile's own link """
+        return get_tile_html(self.visible, self.player, link or self.link)
 
     @classmethod
     def get_style(cls, size='50px'):
@@ -40,10 +45,44 @@ class HtmlTile(Tile):
     def set_link(self, link):
         """ set tile link. After setting link, get_html() call will return html with link included """
         self.link = link
-    
 
-class HtmlPlayer(Player):
-    """ Provides access to html for player token """
+
+class HtmlTile(_HtmlTileBehavior, Tile):
+    """ Provides export-to-html functionality on top of the traditional Tile class. For each tile, you'll need to save
+    The Tile's html. Only once do you need to get the tile's style. If you want to include a link on the Tile, set
+    tile's link attribute to desired link, and then call get_html
+    """
+    link = None
+
+
+class SlotHtmlTile(_HtmlTileBehavior, SlotTile):
+    """ HtmlTile without a per-instance __dict__ """
+    __slots__ = ('link',)
+
+    def __init__(self, x, y):
+        super(SlotHtmlTile, self).__init__(x, y)
+        self.link = None
+
+
+class HtmlTileView(_HtmlTileBehavior, TileView):
+    """ HtmlTile holding no state of its own; its link is kept by the board. See LazyHtmlGameBoard """
+    __slots__ = ()
+
+    @property
+    def link(self):
+        return self.board.tileLinks.get((self.x, self.y))
+
+    @link.setter
+    def link(self, link):
+        if link is None:
+            self.board.tileLinks.pop((self.x, self.y), None)
+        else:
+            self.board.tileLinks[self.x, self.y] = link
+
+
+class _HtmlPlayerBehavior(object):
+    """ html export shared by HtmlPlayer and SlotHtmlPlayer """
+    __slots__ = ()
 
     def get_html(self):# build html representing player
         """ return player state in html format """
@@ -55,6 +94,10 @@ class HtmlPlayer(Player):
         html = '<div class="player ' + activity + '" style="background-color:' + self.color + '"></div>'
         return html
 
+    def get_html_key(self):
+        """ return tuple of everything get_html depends on """
+        return (self.color, self.disabled, self.active)
+
     @classmethod
     def get_style(cls, size='50px'):
         """ return player token style """
@@ -64,25 +107,91 @@ class HtmlPlayer(Player):
         return style
 
 
+class HtmlPlayer(_HtmlPlayerBehavior, Player):
+    """ Provides access to html for player token """
+
+
+class SlotHtmlPlayer(_HtmlPlayerBehavior, SlotPlayer):
+    """ HtmlPlayer without a per-instance __dict__ """
+    __slots__ = ()
+
+
 class HtmlGameBoard(RobotGameBoard):
     """ provides html-export functions for controlling gameboard and getting visual feel """
     Player = HtmlPlayer
     Tile = HtmlTile
+    linkRoot = ''  # prefix of every tile link, for hosting a game below some url
 
     def __init__(self, *args, **kwargs):
         super(HtmlGameBoard, self).__init__(*args, **kwargs)
         self.footer = ''
+        self.removeLinkRoot = None  # while set, every open tile links to its removal, below this url
+        self.exports = dict()  # removeLinkRoot -> (rowHtml, changedRows, playerKeys), see get_html
+        self.linkedTiles = set()  # (x, y) of tiles currently holding a link
+        self.tileLog = []  # (x, y) of every tile change, in order. Its length is the board's version
 
     def get_html(self):
-        """ return html representing board """
-        html = ''
-        for row in self.board:
-            html += '<div class="row">'
-            for tile in row:
-                html += tile.get_html()
-            html += '</div>'  # or some other visual break between rows
-        html += self.footer  # add extras
-        return html
+        """ return html representing board. Only rows holding a tile that changed since the last call are exported
+        again. Rows are cached apart for remove turns, where every open tile links to its removal, and other turns, so
+        switching between turns does not export every row again: each cache holds rows x -> html, the rows changed
+        since it was used, and the html key each player had when it was used. Only rows are kept, not tiles, so a
+        cache holds about as much as the html it returns
+        """
+        mode = self.removeLinkRoot
+        if mode not in self.exports:
+            self.exports[mode] = (dict(), set(), dict())
+        rowHtml, changedRows, playerKeys = self.exports[mode]
+        for i, player in enumerate(self.players):  # players change activity outside of the board
+            key = (player.x, player.y, player.get_html_key())
+            if not playerKeys.get(i) == key:
+                playerKeys[i] = key
+                changedRows.add(player.x)
+        for x in range(self.w):
+            if x in changedRows or x not in rowHtml:
+                tiles = ''.join([self._get_tile_html(x, y) for y in range(self.h)])
+                rowHtml[x] = '<div class="row">' + tiles + '</div>'  # or some other visual break between rows
+        changedRows.clear()
+        rows = [rowHtml[x] for x in range(self.w)]
+        rows.append(self.footer)  # add extras
+        return ''.join(rows)
+
+    def _get_tile_html(self, x, y):
+        """ return html of tile at x, y, linked to its removal during remove turns """
+        link = None if self.removeLinkRoot is None else self.removeLinkRoot + str(x) + ',' + str(y)
+        return self.board[x, y].get_html(link)
+
+    def mark_changed(self, x, y):
+        """ note that html of tile at x, y may have changed, in every export cache """
+        for rowHtml, changedRows, playerKeys in self.exports.values():
+            changedRows.add(x)
+
+    def remove_at(self, x, y):
+        super(HtmlGameBoard, self).remove_at(x, y)
+        self.mark_changed(x, y)
+        self.tileLog.append((x, y))
+
+    def restore_at(self, x, y):
+        super(HtmlGameBoard, self).restore_at(x, y)
+        self.mark_changed(x, y)
+        self.tileLog.append((x, y))
+
+    def get_version(self):
+        """ return number of tile changes made so far. Clients hand it back to get only later changes """
+        return len(self.tileLog)
+
+    def get_tile_changes(self, since):
+        """ return list of [x, y, visible] for each tile changed after version since """
+        coordinates = sorted(set(self.tileLog[since:]))
+        return [[x, y, bool(self.board[x, y].visible)] for x, y in coordinates]
+
+    def get_gap_coordinates(self):
+        """ return list of [x, y] for every removed tile """
+        return [[x, y] for x, y, tile in self if not tile.visible]
+
+    def move_player(self, player, x, y):
+        self.mark_changed(player.x, player.y)
+        super(HtmlGameBoard, self).move_player(player, x, y)
+        self.mark_changed(x, y)
 
     def set_footer(self, footer):
         """ set text at botom of html board. Typically used for announcing end-of-game message """
@@ -95,8 +204,17 @@ class HtmlGameBoard(RobotGameBoard):
 
     def reset_links(self):
         """ reset links in all tiles """
-        for x, y, tile in self:
-            tile.reset_links()
+        for x, y in self.linkedTiles:
+            self.board[x, y].reset_links()
+            self.mark_changed(x, y)
+        self.linkedTiles.clear()
+        self.removeLinkRoot = None
+
+    def set_tile_link(self, tile, link):
+        """ set link on tile, keeping track of it so the tile's html is exported again """
+        tile.set_link(link)
+        self.linkedTiles.add((tile.x, tile.y))
+        self.mark_changed(tile.x, tile.y)
 
     def set_tile_links_for_player_move(self, player):
         """ set tile links around player for moving the player there """
@@ -106,12 +224,13 @@ class HtmlGameBoard(RobotGameBoard):
             x2, y2 = tile.x, tile.y
             if x == x2 and y == y2:  # skip tile under player
                 continue
-            tile.set_link("/move_player_to/" + str(x2) + ',' + str(y2))
+            self.set_tile_link(tile, self.linkRoot + "/move_player_to/" + str(x2) + ',' + str(y2))
 
     def set_tile_links_for_tile_remove(self):
-        """ set tile links on all removable tiles """
-        for x, y, tile in self:
-            tile.set_link("/remove_tile_at/" + str(x) + ',' + str(y))
+        """ link all open tiles to their removal. The links are not stored in the tiles, but added on export (see
+        get_html), so a remove turn costs the same however large the board
+        """
+        self.removeLinkRoot = self.linkRoot + "/remove_tile_at/"
 
 
 class HtmlGame(RobotGame):
@@ -119,6 +238,8 @@ class HtmlGame(RobotGame):
     GameBoard = HtmlGameBoard
     Player = HtmlPlayer  # "magically" this now will spawn an HtmlPlayer, not just a normal player
     Tile = HtmlTile
+    _styleCache = dict()  # (class, size) -> style html, shared by all games
+    _turnNames = {RobotGame.MOVE_PLAYER: 'move', RobotGame.REMOVE_TILE: 'remove', RobotGame.GAME_OVER: 'over'}
 
     def get_html(self):
         """ get html of game. This will force links in board and tiles to update, and then get all html and styles for board
@@ -126,10 +247,17 @@ class HtmlGame(RobotGame):
         """
         self.prep_links()
         html = self.board.get_html()
-        style = self.get_style('50px')  # even though it's a class method, we called using self, meaning
-                            # that the function will use this instance and its variables instead of the class's
+        style = self.get_cached_style('50px')
         script = self.get_scripts()
-        return '<style>' + style  + '</style>' + html + script
+        return ''.join([style, html, script])
+
+    @classmethod
+    def get_cached_style(cls, size='50px'):
+        """ return style block of game. Styles never change, so they are built once per class and size """
+        key = (cls, size)
+        if key not in cls._styleCache:
+            cls._styleCache[key] = '<style>' + cls.get_style(size) + '</style>'
+        return cls._styleCache[key]
     
     @classmethod
     def get_style(cls, size='50px'):
@@ -139,12 +267,16 @@ class HtmlGame(RobotGame):
         style += cls.Player.get_style(size)
         return style
 
+    def set_link_root(self, linkRoot):
+        """ prefix all links of the game with linkRoot, like '/games/1234'. Use when hosting game below some url """
+        self.board.linkRoot = linkRoot
+
     def get_scripts(self):
         """ return scripts to execute after loading html """ 
         if not self.get_active_player().humanControlled:
             return """<script>
                                 setTimeout(function(){
-                                   window.location='/robot_takes_turn/';
+                                   window.location='""" + self.board.linkRoot + """/robot_takes_turn/';
                                 }, 1000);
                             </script>"""  # reloads page after 1 second, to call robot_takes_turn
         else:
@@ -153,6 +285,7 @@ class HtmlGame(RobotGame):
     def prep_links(self):
         """ erase links on board and prepare new links corresponding to game state (and what turn it is) """
         self.board.reset_links()
+        self.board.set_footer('')  # an undone game-over must not keep announcing a winner
         if self.turnType == self.MOVE_PLAYER:
             player = self.get_active_player()
             self.board.set_tile_links_for_player_move(player)
@@ -165,6 +298,179 @@ class HtmlGame(RobotGame):
         else:
             raise  # problem with our logic
 
+    def get_state(self):
+        """ return dictionary of full game state, ready to convert to JSON. Includes everything in get_delta(), plus
+        board size and all removed tiles
+        """
+        state = self.get_delta(self.board.get_version())
+        state['w'], state['h'] = self.board.w, self.board.h
+        state['gaps'] = self.board.get_gap_coordinates()
+        return state
+
+    def get_delta(self, since=0):
+        """ return dictionary describing what changed after board version since: changed tiles as [x, y, visible],
+        position and status of every player, turn type and whether the last action succeeded. The version returned
+        should be handed back on the next call
+        """
+        board = self.board
+        since = min(max(since, 0), board.get_version())
+        players = []
+        for player in board.players:
+            status = 'disabled' if player.disabled else ('active' if player.active else '')
+            players.append({'x': player.x, 'y': player.y, 'color': player.color, 'status': status,
+                            'human': player.humanControlled})
+        delta = {'version': board.get_version(),
+                 'tiles': board.get_tile_changes(since),
+                 'players': players,
+                 'turn': self._turnNames[self.turnType],
+                 'turnSuccessful': self.turnSuccessful,
+                 'footer': ''}
+        if self.turnType == self.GAME_OVER:
+            delta['footer'] = self.get_active_player().colorName + ' player wins!'
+        return delta
+
+
+class ClientHtmlGame(HtmlGame):
+    """ HtmlGame whose page updates itself in place. After the first page load, clicks on tiles (and robot turns) are
+    sent to the JSON api, and the returned delta is applied to the page by a small script. Tile links keep working
+    as normal page loads if scripts are disabled.
+
+    Attributes:
+        robotDelay: milliseconds the page waits before asking for the next robot action
+        apiRoot: url of the JSON api, below the game's link root
+    """
+    robotDelay = 300
+    apiRoot = '/api'
+
+    def get_scripts(self):
+        """ return script that applies JSON deltas to the page """
+        state = json.dumps(self.get_delta(self.board.get_version()))
+        script = self._clientScript.replace('STATE', state)
+        script = script.replace('API_ROOT', self.board.linkRoot + self.apiRoot)
+        script = script.replace('LINK_ROOT', self.board.linkRoot)
+        script = script.replace('ROBOT_DELAY', str(self.robotDelay))
+        return '<script>' + script + '</script>'
+
+    _clientScript = """(function(){
+var version = 0;
+function tileAt(x, y) { return document.querySelectorAll('div.row')[x].children[y]; }
+function removeAll(selector) {
+    var found = document.querySelectorAll(selector);
+    for (var i = 0; i < found.length; i++) { found[i].parentNode.removeChild(found[i]); }
+}
+function isOpen(tile) { return tile.className.indexOf('visible') >= 0 && !tile.querySelector('div.player'); }
+function addLink(x, y, path) {
+    var tile = tileAt(x, y);
+    if (!isOpen(tile)) { return; }
+    var link = document.createElement('a');
+    link.className = 'tile-link';
+    link.href = 'LINK_ROOT/' + path + '/' + x + ',' + y;
+    tile.appendChild(link);
+}
+function apply(delta) {
+    version = delta.version;
+    delta.tiles.forEach(function(t) { tileAt(t[0], t[1]).className = 'tile ' + (t[2] ? 'visible' : 'hidden'); });
+    removeAll('div.player');
+    removeAll('a.tile-link');
+    delta.players.forEach(function(p) {
+        var token = document.createElement('div');
+        token.className = 'player ' + p.status;
+        token.style.backgroundColor = p.color;
+        tileAt(p.x, p.y).appendChild(token);
+    });
+    var rows = document.querySelectorAll('div.row');
+    var active = delta.players[0];
+    if (delta.turn === 'move') {
+        for (var x = active.x - 1; x <= active.x + 1; x++) {
+            for (var y = active.y - 1; y <= active.y + 1; y++) {
+                if (x >= 0 && y >= 0 && x < rows.length && y < rows[x].children.length) { addLink(x, y, 'move_player_to'); }
+            }
+        }
+    } else if (delta.turn === 'remove') {
+        for (var x = 0; x < rows.length; x++) {
+            for (var y = 0; y < rows[x].children.length; y++) { addLink(x, y, 'remove_tile_at'); }
+        }
+    }
+    var footer = document.getElementById('footer');
+    if (!footer) {
+        footer = document.createElement('div');
+        footer.id = 'footer';
+        rows[rows.length - 1].parentNode.appendChild(footer);
+    }
+    footer.textContent = delta.footer;
+    if (delta.turn !== 'over' && !active.human) {
+        setTimeout(function() { send('API_ROOT/robot_step', '&wait=5'); }, ROBOT_DELAY);
+    }
+}
+function send(url, extra) {
+    var request = new XMLHttpRequest();
+    request.open('GET', url + '?since=' + version + (extra || ''));
+    request.onload = function() { apply(JSON.parse(request.responseText)); };
+    request.send();
+}
+document.addEventListener('click', function(event) {
+    var target = event.target;
+    if (target.className !== 'tile-link') { return; }
+    var match = target.getAttribute('href').match(/(move_player_to|remove_tile_at)\/(\d+),(\d+)/);
+    if (!match) { return; }
+    event.preventDefault();
+    var action = match[1] === 'move_player_to' ? 'move' : 'remove';
+    send('API_ROOT/' + action + '/' + match[2] + ',' + match[3]);
+});
+var state = STATE;
+version = state.version;
+if (state.turn !== 'over' && !state.players[0].human) {
+    setTimeout(function() { send('API_ROOT/robot_step', '&wait=5'); }, ROBOT_DELAY);
+}
+})();"""
+
+
+class BitHtmlGameBoard(BitBoardMixin, HtmlGameBoard):
+    """ HtmlGameBoard that answers game rules from bitmasks. Tiles and Players still provide the html """
+
+
+class BitHtmlGame(HtmlGame):
+    """ HtmlGame backed by a BitHtmlGameBoard """
+    GameBoard = BitHtmlGameBoard
+
+
+class SlotHtmlGame(HtmlGame):
+    """ HtmlGame whose Tiles and Players have no per-instance __dict__ """
+    Player = SlotHtmlPlayer
+    Tile = SlotHtmlTile
+
+
+class LazyHtmlGameBoard(LazyTileMixin, HtmlGameBoard):
+    """ HtmlGameBoard creating HtmlTileViews only when they are addressed. Tile links are kept in tileLinks """
+    Player = SlotHtmlPlayer
+    Tile = HtmlTileView
+
+    def setup(self, size=(9,9)):
+        self.tileLinks = dict()  # (x, y) -> link
+        super(LazyHtmlGameBoard, self).setup(size)
+
+    def _get_tile_html(self, x, y):
+        """ export tile at x, y straight from the board's state, without creating its HtmlTileView """
+        link = self.tileLinks.get((x, y))
+        if self.removeLinkRoot is not None:
+            link = self.removeLinkRoot + str(x) + ',' + str(y)
+        visible = not self.cellStates.item(x, y) == self.GAP_STATE
+        return get_tile_html(visible, self.occupants.get((x, y)), link)
+
+
+class LazyHtmlGame(HtmlGame):
+    """ HtmlGame keeping its board in compact arrays, for servers holding many games at once """
+    GameBoard = LazyHtmlGameBoard
+    Player = SlotHtmlPlayer
+    Tile = HtmlTileView
+
+
+class LazyClientHtmlGame(ClientHtmlGame):
+    """ ClientHtmlGame keeping its board in compact arrays, like LazyHtmlGame. The game main.py hosts """
+    GameBoard = LazyHtmlGameBoard
+    Player = SlotHtmlPlayer
+    Tile = HtmlTileView
+
 
 if __name__ == '__main__':
     from flask import Flask
@@ -0,0 +1,55 @@
+import importlib.util
+import sys
+import threading
+import types
+
+_lock = threading.RLock()
+_loading = set()  # ids of lazy modules whose code is running, so their own imports may look inside them
+
+
+class _LazyModule(types.ModuleType):
+    """ module whose code runs on first attribute access, then becomes a plain module. Unlike modules made by
+    importlib.util.LazyLoader (before python 3.12), many threads may touch it first at once: one runs the module's code
+    while the others wait for it to finish, instead of finding it half loaded
+    """
+
+    def __getattribute__(self, attr):
+        if type(self) is _LazyModule:
+            with _lock:
+                if type(self) is _LazyModule and id(self) not in _loading:
+                    _loading.add(id(self))
+                    spec = types.ModuleType.__getattribute__(self, '__spec__')
+                    try:
+                        spec.loader.exec_module(self)
+                        self.__class__ = types.ModuleType
+                    except BaseException:
+                        if sys.modules.get(spec.name) is self:
+                            del sys.modules[spec.name]  # like a failed import, leave no half loaded module behind
+                        raise
+                    finally:
+                        _loading.discard(id(self))
+        return types.ModuleType.__getattribute__(self, attr)
+
+
+def lazy_import(name):
+    """ return module name without executing it yet. The module is loaded on first attribute access, so modules that
+    only use a heavy dependency (like numpy) inside functions import quickly. If the module is already loaded, it is
+    returned as is. Safe to first use from several threads at once. Use as: np = lazy_import('numpy')
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError('No module named ' + name)
+    module = importlib.util.module_from_spec(spec)
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+    return module
+
+
+def is_loaded(name):
+    """ return True if module name has been imported and its code has run, so using it costs nothing more. A module
+    made by lazy_import but not touched yet is not loaded
+    """
+    module = sys.modules.get(name)
+    return module is not None and type(module) is not _LazyModule  # type(), as touching module would load it
@@ -60,13 +60,23 @@ class TileRemoveBot(RandomBot):
 class MoveBot(TileRemoveBot):
     """ MoveBot moves toward open, escapable tiles. It calculates the best location(s) on a board by looking at the
     # of open neighboring tiles for all tiles -- twice. It chooses to move towards a tile that has the most desireable
-    neighboring tiles
+    neighboring tiles. Analysis is cached, so revisiting a board position does not repeat the calculation.
+    Once the board splits and a player is isolated in a small region, MoveBot plays exactly instead (see
+    BoardAnalyzer.EndgameSolver): it moves to survive longest when isolated itself, and removes the tiles that
+    trap an isolated opponent soonest
     """
-    
+    SweetSpotGrid = BoardAnalyzer.CachedSweetSpotGrid
+    PartitionGrid = BoardAnalyzer.PartitionGrid
+    EndgameSolver = BoardAnalyzer.EndgameSolver
+
     def take_move_player_turn(self, move_player_fxn):
+        target = self.get_endgame_move()
+        if target is not None:
+            move_player_fxn(*target)
+            return
         x, y = self.player.x, self.player.y
         grid_gen_fxn = self.board.to_number_grid
-        sweetspotter = BoardAnalyzer.SweetSpotGrid(grid_gen_fxn)
+        sweetspotter = self.SweetSpotGrid(grid_gen_fxn)
         grid = sweetspotter.originalGrid
         try:
             x, y = sweetspotter.get_next_move_toward_sweet_spot(grid, x, y)
@@ -75,6 +85,103 @@ class MoveBot(TileRemoveBot):
             return
         move_player_fxn(x, y)
 
+    def take_remove_tile_turn(self, remove_tile_fxn):
+        target = self.get_endgame_removal()
+        if target is not None and self.board.is_valid_tile_remove(*target):  # solver knows nothing of solid tiles
+            remove_tile_fxn(*target)
+            return
+        super(MoveBot, self).take_remove_tile_turn(remove_tile_fxn)
+
+    def get_live_players(self):
+        return [player for player in self.board.players if not player.disabled]
+
+    def get_occupied_bits(self, player):
+        """ return bits (x * h + y) of cells occupied by players other than player, disabled ones included. Regions
+        count players as tiles, but no one can land on them
+        """
+        h = self.board.h
+        bits = 0
+        for other in self.board.players:
+            if not other == player:
+                bits |= 1 << (other.x * h + other.y)
+        return bits
+
+    def get_endgame_move(self):
+        """ return x, y of the move surviving longest if player is isolated in a region small enough to solve, else
+        None
+        """
+        players = self.get_live_players()
+        partitions = self.PartitionGrid(self.board.to_number_grid)
+        position = (self.player.x, self.player.y)
+        if len(players) < 2 or not partitions.is_isolated(position, [(p.x, p.y) for p in players]):
+            return None
+        tiles = partitions.get_region_bits(*position) & ~self.get_occupied_bits(self.player)
+        if bin(tiles).count('1') > self.EndgameSolver.maxTiles:
+            return None
+        h = self.board.h
+        solver = self.EndgameSolver(self.board.w, h)
+        target, survival = solver.get_best_move(tiles, position[0] * h + position[1], len(players) - 1)
+        return None if target is None else divmod(target, h)
+
+    def get_endgame_removal(self):
+        """ return x, y of the removal trapping an opponent soonest, among opponents isolated in regions small enough
+        to solve, or None if there are none
+        """
+        players = self.get_live_players()
+        partitions = self.PartitionGrid(self.board.to_number_grid)
+        positions = [(p.x, p.y) for p in players]
+        h = self.board.h
+        best = (None, None)
+        for player in players:
+            position = (player.x, player.y)
+            if player == self.player or not partitions.is_isolated(position, positions):
+                continue
+            tiles = partitions.get_region_bits(*position) & ~self.get_occupied_bits(player)
+            if bin(tiles).count('1') > self.EndgameSolver.maxTiles:
+                continue
+            solver = self.EndgameSolver(self.board.w, h)
+            target, survival = solver.get_best_removal(tiles, position[0] * h + position[1], len(players) - 1)
+            if target is not None and (best[1] is None or survival < best[1]):
+                best = (target, survival)
+        return None if best[0] is None else divmod(best[0], h)
+
+
+class RegionBot(MoveBot):
+    """ RegionBot moves like MoveBot, but chooses removals by their effect on the regions players can still reach
+    (see BoardAnalyzer.RemovalGrid): it removes the tile cutting the most tiles off from opponents, less any cut off
+    from itself. Among equally scored tiles, while it still shares a region with an opponent, it takes the one that
+    walls it off from every opponent with the most tiles over them, if any does. Otherwise it prefers tiles around
+    opponents but not around itself, like TileRemoveBot
+    """
+    RemovalGrid = BoardAnalyzer.RemovalGrid
+
+    def take_remove_tile_turn(self, remove_tile_fxn):
+        removableTiles = self.board.get_all_open_removable_tiles()
+        opponents = [player for player in self.board.players if not player == self.player and not player.disabled]
+        if not removableTiles or not opponents:
+            super(RegionBot, self).take_remove_tile_turn(remove_tile_fxn)
+            return
+        remover = self.RemovalGrid(self.board.to_number_grid)
+        positions = [(self.player.x, self.player.y)] + [(player.x, player.y) for player in opponents]
+        scores = remover.get_removal_scores(positions[0], positions[1:])
+        best = max(scores[tile.x, tile.y] for tile in removableTiles)
+        candidates = [tile for tile in removableTiles if scores[tile.x, tile.y] == best]
+        if len(candidates) > 1:
+            leads = remover.get_isolation_leads(positions, [(tile.x, tile.y) for tile in candidates])
+            if leads.max() > 0 and not remover.is_partitioned(positions):
+                candidates = [tile for tile, lead in zip(candidates, leads) if lead == leads.max()]
+        candidates = set(candidates)
+        tilesAroundOpponents = set()
+        for player in opponents:
+            tilesAroundOpponents.update(self.board.get_removable_tiles_around(player.x, player.y))
+        tilesAroundMe = set(self.board.get_removable_tiles_around(self.player.x, self.player.y))
+        for preferred in (candidates & tilesAroundOpponents - tilesAroundMe, candidates & tilesAroundOpponents,
+                          candidates - tilesAroundMe, candidates):
+            if preferred:
+                target = random.choice(sorted(preferred, key=lambda tile: (tile.x, tile.y)))
+                remove_tile_fxn(target.x, target.y)
+                return
+
 
 class RobotGameBoard(Game.GameBoard):
     """ allow defining robots in board """
@@ -91,7 +198,12 @@ class RobotGameBoard(Game.GameBoard):
 
 
 class RobotGame(Game.Game):
-    """ game handles adding robots to gameplay """
+    """ game handles adding robots to gameplay. Robot is the class of robot created for each non-human player.
+    FallbackRobot is a cheap robot, used to pick an action when the real robot takes too long deciding
+    """
+    GameBoard = RobotGameBoard
+    Robot = MoveBot
+    FallbackRobot = TileRemoveBot
 
     def setup(self, numPlayers=2, shape=(9,9), numRobots=0):
         self.board = self.GameBoard()
@@ -103,14 +215,20 @@ class RobotGame(Game.Game):
         self.setup_robots(numRobots)
         self.turnType = self.MOVE_PLAYER  # first player's turn is to move
         self.get_active_player().active = True
+        self.moveStack = []
+        self.redoStack = []
 
-    def setup_robots(self, numRobots):
-        """ set up robots to handle appropriate number player token """
+    def setup_robots(self, numRobots, Robot=None):
+        """ set up robots to handle appropriate number player token. Robots are of class Robot if given (MCTSBot or
+        AlphaBetaBot from SearchBot, for example), else of the game's Robot class. Robot may also be a list of robot
+        classes, one per robot player in seat order
+        """
         self.board.set_num_robot_players(numRobots)
-        for player in self.board.players:
-            if not player.humanControlled:
-                robot = MoveBot(self, self.board, player)
-                self.robots[player] = robot
+        robotPlayers = [player for player in self.board.players if not player.humanControlled]
+        Robots = Robot if isinstance(Robot, (list, tuple)) else [Robot or self.Robot] * len(robotPlayers)
+        for player, Robot in zip(robotPlayers, Robots):
+            robot = Robot(self, self.board, player)
+            self.robots[player] = robot
 
     def robot_takes_turn(self):
         """ if active player is robot (AI), will guide robot into taking part of its turn (remove-tile or move-player) """
@@ -128,7 +246,34 @@ class RobotGame(Game.Game):
             pass  # game over, we do nothing
         else:
             raise  # problem with our logic
-    
+
+    def get_robot_action(self, Robot=None):
+        """ ask active robot what it would do, without doing it. If Robot class is given, a new robot of that class
+        decides instead of the active player's robot. Returns (turnType, x, y), or None if it is not a robot's turn
+        """
+        activePlayer = self.get_active_player()
+        if activePlayer.humanControlled or self.turnType == self.GAME_OVER:
+            return None
+        robot = self.robots[activePlayer] if Robot is None else Robot(self, self.board, activePlayer)
+        turnType = self.turnType
+        actions = []
+        capture_fxn = lambda x, y: actions.append((turnType, x, y))
+        if turnType == self.REMOVE_TILE:
+            robot.take_remove_tile_turn(capture_fxn)
+        else:
+            robot.take_move_player_turn(capture_fxn)
+        return actions[0] if actions else None
+
+    def apply_robot_action(self, action):
+        """ carry out action from get_robot_action(), if it is still a robot's turn of the same type """
+        turnType, x, y = action
+        if self.get_active_player().humanControlled or not turnType == self.turnType:
+            self.turnSuccessful = False
+        elif turnType == self.REMOVE_TILE:
+            super(RobotGame, self).player_removes_tile(x, y)
+        else:
+            super(RobotGame, self).player_moves_player(x, y)
+
     def player_removes_tile(self, x, y):
         """ if active player is human, carry out function. Otherwise exit """
         activePlayer = self.get_active_player()
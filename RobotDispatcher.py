@@ -0,0 +1,193 @@
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from BitBoard import BitBoardMixin, get_bits_from_mask
+from Board import LazyTileMixin
+from Game import TileView
+from RobotBoard import RobotGame, RobotGameBoard
+
+
+def decide_robot_action(game):
+    """ return action the active robot of game would take. Module-level, so a process pool can run it too """
+    return game.get_robot_action()
+
+
+class SnapshotGameBoard(BitBoardMixin, LazyTileMixin, RobotGameBoard):
+    """ board of a game snapshot. Holds only cellStates, landable counts, solid cells, players and bitmasks; tiles are
+    created when a robot addresses them, and rules are answered from the bitmasks
+    """
+    Tile = TileView
+
+    def copy_state(self, board):
+        """ take over the tile and player state of board, which has the same shape. Players are copied, so the copies
+        can be moved without moving the originals. Return dictionary of id(original player) -> its copy
+        """
+        self.cellStates[...] = board.cellStates
+        self.landableCounts = list(board.landableCounts)
+        self.solidCells = set(board.solidCells)
+        copies = dict((id(player), copy.copy(player)) for player in board.players)
+        self.players = [copies[id(player)] for player in board.players]
+        self.occupants = dict(((player.x, player.y), player) for player in self.players)
+        self.visibleBits = get_bits_from_mask(self.cellStates != self.GAP_STATE)
+        self.occupiedBits = get_bits_from_mask(self.cellStates == self.PLAYER_STATE)
+        self.solidBits = 0
+        for x, y in self.solidCells:
+            self.solidBits |= self.bit_at(x, y)
+        return copies
+
+
+class SnapshotGame(RobotGame):
+    """ game a robot decides on while the real game goes on. See snapshot_game """
+    GameBoard = SnapshotGameBoard
+    Tile = TileView
+
+
+def snapshot_game(game):
+    """ return copy of game for a robot to decide on while the real game goes on. Only what robots read is copied:
+    the cell states, players and turn, not the game's Tiles, history or html, so copying costs little even for
+    large boards. Robots are copied shallowly and bound to the copy, so search state they set during a decision stays
+    with the copy, while tables they keep between turns (like AlphaBetaBot's transposition table) are still shared
+    with the real robots
+    """
+    snapshot = SnapshotGame()
+    snapshot.board = snapshot.GameBoard()
+    snapshot.board.setup((game.board.w, game.board.h))
+    copies = snapshot.board.copy_state(game.board)
+    snapshot.turnType = game.turnType
+    snapshot.moveStack = []
+    snapshot.redoStack = []
+    snapshot.robots = dict()
+    for player, robot in game.robots.items():
+        robotCopy = copy.copy(robot)
+        robotCopy.game, robotCopy.board, robotCopy.player = snapshot, snapshot.board, copies[id(player)]
+        snapshot.robots[robotCopy.player] = robotCopy
+    return snapshot
+
+
+def get_turn_key(game):
+    """ return value that changes whenever the game moves on, so a late robot decision is never applied to a turn
+    it was not made for
+    """
+    return (game.turnType, game.get_active_player(), game.board.cellStates.tobytes())
+
+
+class RobotJob(object):
+    """ one robot turn being decided in the background.
+
+    Attributes:
+        finished: threading.Event set once an action has been applied (or the turn moved on without one)
+        source: 'robot' if the robot's own decision was applied, 'fallback' if the deadline passed and the game's
+            FallbackRobot decided instead, or None while unfinished
+        future: future of the robot's decision, or None until its search starts
+        waitsFor: future of an earlier, late search of the same game that must end before this one starts, or None
+    """
+
+    def __init__(self, session, turnKey, deadline):
+        self.session = session
+        self.turnKey = turnKey
+        self.deadline = deadline
+        self.finished = threading.Event()
+        self.source = None
+        self.future = None
+        self.waitsFor = None
+        self.timer = None
+
+    def is_finished(self):
+        return self.finished.is_set()
+
+
+class RobotDispatcher(object):
+    """ decides robot turns on a background executor, so the request that asks for a robot turn can return at once.
+    Robots decide on a snapshot of the game (see snapshot_game), never on the game being played. Decisions are applied
+    to the game while holding its session lock, and only if the game is still at the turn they were made for. If the
+    robot has not decided within deadline seconds, the game's FallbackRobot picks the action instead and the late
+    decision is dropped. A late search keeps running, though, so the next search of the same game waits for it to
+    end: robots never search twice at once, as they may share tables between searches.
+    Works with any GameSession-like object holding game, lock and robotJob attributes.
+
+    Attributes:
+        executor: concurrent.futures executor the robots decide on. A ProcessPoolExecutor also works, in which case
+            a copy of the game is pickled to the worker process
+        deadline: seconds a robot may take to decide one action
+    """
+
+    def __init__(self, executor=None, deadline=2.0, maxWorkers=4):
+        self.executor = executor or ThreadPoolExecutor(maxWorkers)
+        self.deadline = deadline
+
+    def start(self, session):
+        """ start deciding the robot turn of session's game, unless one is already being decided. Return the
+        RobotJob, or None if it is not a robot's turn
+        """
+        with session.lock:
+            game = session.game
+            job = session.robotJob
+            if job is not None and not job.is_finished():
+                return job
+            if game.turnType == game.GAME_OVER or game.get_active_player().humanControlled:
+                return None
+            previous = job
+            job = RobotJob(session, get_turn_key(game), time.time() + self.deadline)
+            session.robotJob = job
+            job.timer = threading.Timer(self.deadline, self._on_deadline, [job])
+            job.timer.daemon = True
+            job.timer.start()
+            snapshot = snapshot_game(game)
+            if previous is not None:
+                running = previous.future or previous.waitsFor
+                job.waitsFor = running if running is not None and not running.done() else None
+            if job.waitsFor is not None:
+                job.waitsFor.add_done_callback(lambda future: self._submit(job, snapshot))
+            else:
+                self._submit(job, snapshot)
+            return job
+
+    def _submit(self, job, snapshot):
+        if job.is_finished():
+            return  # fallback robot already took the turn while an earlier search was running
+        job.future = self.executor.submit(decide_robot_action, snapshot)
+        job.future.add_done_callback(lambda future: self._on_decided(job, future))
+
+    def wait(self, session, timeout):
+        """ wait up to timeout seconds for session's robot job to finish. Return True if no job is left running """
+        job = session.robotJob
+        if job is None:
+            return True
+        return job.finished.wait(timeout)
+
+    def is_pending(self, session):
+        """ return True if a robot turn is being decided for session """
+        job = session.robotJob
+        return job is not None and not job.is_finished()
+
+    def _on_decided(self, job, future):
+        if future.cancelled() or future.exception() is not None:
+            self._on_deadline(job)  # robot failed; let the fallback robot decide right away
+            return
+        self._finish(job, future.result(), 'robot')
+
+    def _on_deadline(self, job):
+        if job.is_finished():
+            return
+        with job.session.lock:
+            game = job.session.game
+            action = None
+            if get_turn_key(game) == job.turnKey:
+                action = game.get_robot_action(game.FallbackRobot)
+        self._finish(job, action, 'fallback')
+
+    def _finish(self, job, action, source):
+        with job.session.lock:
+            if job.is_finished():
+                return  # other path (decision or deadline) already applied an action
+            game = job.session.game
+            if action is not None and get_turn_key(game) == job.turnKey:
+                game.apply_robot_action(action)
+            job.source = source
+            job.finished.set()
+            if job.timer is not None:
+                job.timer.cancel()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
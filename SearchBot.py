@@ -0,0 +1,622 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from BitBoard import get_shape_masks
+from RobotBoard import RandomBot
+
+
+def count_bits(bits):
+    """ return number of set bits in integer """
+    return bin(bits).count('1')
+
+
+_zobristCache = dict()  # (w, h, numSeats) -> ZobristKeys
+
+
+class ZobristKeys(object):
+    """ random 64-bit keys used to hash a SearchState. XOR-ing the keys of every removed tile, every player position,
+    the active seat, turn type and disabled seats gives a hash that can be updated incrementally on each action
+    """
+
+    def __init__(self, w, h, numSeats):
+        rand = random.Random(w * 1000003 + h * 1009 + numSeats)  # same keys for every search on this shape
+        cells = w * h
+        self.removed = [rand.getrandbits(64) for i in range(cells)]
+        self.position = [[rand.getrandbits(64) for i in range(cells)] for seat in range(numSeats)]
+        self.active = [rand.getrandbits(64) for seat in range(numSeats)]
+        self.disabled = [rand.getrandbits(64) for seat in range(numSeats)]
+        self.turnType = dict()
+
+    @classmethod
+    def for_shape(cls, w, h, numSeats):
+        key = (w, h, numSeats)
+        if key not in _zobristCache:
+            _zobristCache[key] = cls(w, h, numSeats)
+        return _zobristCache[key]
+
+
+class SearchState(object):
+    """ compact copy of a Game, made for searching. Tiles and players are held as integer bitmasks and player seats,
+    where bit (x * h + y) represents coordinate x, y. Actions are applied with make() and reverted with unmake(), so
+    a search can walk the game tree without copying the board. Follows the same turn rules as Game: each player moves,
+    then removes a tile; trapped players are disabled when their turn comes up; the game is over once every player
+    but the active one is trapped or disabled.
+
+    Attributes:
+        positions: bit index of each seat's player. Seat 0 is the active player when the state is created
+        disabled: list of True/False for each seat
+        active: seat whose turn it is
+        hash: zobrist hash of the state
+    """
+
+    def __init__(self, game):
+        board = game.board
+        self.MOVE_PLAYER, self.REMOVE_TILE, self.GAME_OVER = game.MOVE_PLAYER, game.REMOVE_TILE, game.GAME_OVER
+        self.w, self.h = board.w, board.h
+        self.aroundMasks, self.neighborMasks = get_shape_masks(self.w, self.h)
+        self.visible = 0
+        self.solid = 0
+        for x, y, tile in board:
+            if tile.visible:
+                self.visible |= 1 << (x * self.h + y)
+            if tile.solid:
+                self.solid |= 1 << (x * self.h + y)
+        self.players = list(board.players)
+        self.positions = [p.x * self.h + p.y for p in self.players]
+        self.occupied = 0
+        for pos in self.positions:
+            self.occupied |= 1 << pos
+        self.disabled = [p.disabled for p in self.players]
+        self.active = 0
+        self.turnType = game.turnType
+        self.keys = ZobristKeys.for_shape(self.w, self.h, len(self.players))
+        self.hash = self._calculate_hash()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['aroundMasks'], state['neighborMasks'], state['keys']  # shared per shape; rebuilt on unpickling
+        state['players'] = None  # Player objects stay with the game
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.aroundMasks, self.neighborMasks = get_shape_masks(self.w, self.h)
+        self.keys = ZobristKeys.for_shape(self.w, self.h, len(self.positions))
+
+    def _calculate_hash(self):
+        keys = self.keys
+        value = self._get_turn_hash()
+        for i in range(self.w * self.h):
+            if not self.visible >> i & 1:
+                value ^= keys.removed[i]
+        for seat, pos in enumerate(self.positions):
+            value ^= keys.position[seat][pos]
+            if self.disabled[seat]:
+                value ^= keys.disabled[seat]
+        return value
+
+    def _get_turn_hash(self):
+        keys = self.keys
+        if self.turnType not in keys.turnType:
+            keys.turnType[self.turnType] = random.Random(self.turnType).getrandbits(64)
+        return keys.active[self.active] ^ keys.turnType[self.turnType]
+
+    def get_xy(self, pos):
+        """ convert bit index into x, y coordinates """
+        return divmod(pos, self.h)
+
+    def get_landable_bits(self):
+        return self.visible & ~self.occupied
+
+    def get_removable_bits(self):
+        return self.visible & ~self.occupied & ~self.solid
+
+    def get_mobility(self, seat):
+        """ return number of tiles the player in seat can move to """
+        return count_bits(self.neighborMasks[self.positions[seat]] & self.get_landable_bits())
+
+    def is_trapped(self, seat):
+        return not self.neighborMasks[self.positions[seat]] & self.get_landable_bits()
+
+    def is_game_over(self):
+        """ True if all seats--excluding active seat--are either trapped or disabled """
+        for seat in range(len(self.positions)):
+            if seat != self.active and not self.disabled[seat] and not self.is_trapped(seat):
+                return False
+        return True
+
+    def get_winner(self):
+        """ return seat that won the game. Only meaningful once turnType is GAME_OVER """
+        return self.active
+
+    def get_actions(self):
+        """ return list of bit indexes the active seat can act upon: tiles to move to on a MOVE_PLAYER turn, or tiles
+        to remove on a REMOVE_TILE turn
+        """
+        if self.turnType == self.MOVE_PLAYER:
+            bits = self.neighborMasks[self.positions[self.active]] & self.get_landable_bits()
+        elif self.turnType == self.REMOVE_TILE:
+            bits = self.get_removable_bits()
+        else:
+            return []
+        actions = []
+        while bits:
+            lowest = bits & -bits
+            actions.append(lowest.bit_length() - 1)
+            bits ^= lowest
+        return actions
+
+    def make(self, pos):
+        """ apply active seat's action at bit index pos. Return record to hand to unmake() """
+        record = (pos, self.active, self.turnType, tuple(self.disabled), self.hash, self.visible,
+                  self.occupied, self.positions[self.active])
+        keys = self.keys
+        self.hash ^= self._get_turn_hash()
+        if self.turnType == self.MOVE_PLAYER:
+            seat = self.active
+            oldPos = self.positions[seat]
+            self.occupied = (self.occupied & ~(1 << oldPos)) | (1 << pos)
+            self.positions[seat] = pos
+            self.hash ^= keys.position[seat][oldPos] ^ keys.position[seat][pos]
+        else:
+            self.visible &= ~(1 << pos)
+            self.hash ^= keys.removed[pos]
+        self._setup_next_turn()
+        self.hash ^= self._get_turn_hash()
+        return record
+
+    def unmake(self, record):
+        """ revert action applied by make() """
+        pos, self.active, self.turnType, disabled, self.hash, self.visible, self.occupied, oldPos = record
+        self.disabled[:] = disabled
+        self.positions[self.active] = oldPos
+
+    def _setup_next_turn(self):
+        if self.is_game_over():
+            self.turnType = self.GAME_OVER
+        elif self.turnType == self.MOVE_PLAYER:
+            self.turnType = self.REMOVE_TILE
+        else:
+            self.turnType = self.MOVE_PLAYER
+            self._setup_next_active_seat()
+
+    def _setup_next_active_seat(self):
+        while True:
+            self.active = (self.active + 1) % len(self.positions)
+            if not self.disabled[self.active] and not self.is_trapped(self.active):
+                return
+            if not self.disabled[self.active]:
+                self.disabled[self.active] = True
+                self.hash ^= self.keys.disabled[self.active]
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaBot(RandomBot):
+    """ AlphaBetaBot searches the game tree with iterative-deepening alpha-beta, treating each move and each tile
+    removal as one ply. With more than two players, every opponent is assumed to play against this bot (a "paranoid"
+    search). Positions are scored by mobility: how many tiles this bot can move to, minus the tiles its opponents can
+    move to. Searched positions are stored in a zobrist-hashed transposition table, which also supplies the first
+    action to try at each position. Tile removals are limited to tiles around opponents to keep the tree narrow.
+    Searching stops once timeBudget seconds have passed; the best action of the deepest completed search is taken.
+
+    Attributes:
+        timeBudget: seconds allowed to search for each action
+        maxDepth: deepest search attempted, in plies
+        maxTableSize: transposition table is cleared once it holds this many positions
+        lastDepth, lastNodes, lastNodesPerSecond, lastScore: statistics of the most recent search
+    """
+    timeBudget = 1.0
+    maxDepth = 64
+    maxTableSize = 500000
+    WIN = 1000000
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, game, board, player):
+        super(AlphaBetaBot, self).__init__(game, board, player)
+        self.table = dict()
+        self.lastDepth = 0
+        self.lastNodes = 0
+        self.lastNodesPerSecond = 0
+        self.lastScore = 0
+
+    def take_move_player_turn(self, move_player_fxn):
+        pos = self.search()
+        if pos is None:
+            super(AlphaBetaBot, self).take_move_player_turn(move_player_fxn)
+            return
+        move_player_fxn(*self.state.get_xy(pos))
+
+    def take_remove_tile_turn(self, remove_tile_fxn):
+        pos = self.search()
+        if pos is None:
+            super(AlphaBetaBot, self).take_remove_tile_turn(remove_tile_fxn)
+            return
+        remove_tile_fxn(*self.state.get_xy(pos))
+
+    def get_search_stats(self):
+        """ return dictionary describing the most recent search """
+        return {'depth': self.lastDepth, 'nodes': self.lastNodes, 'nodesPerSecond': self.lastNodesPerSecond,
+                'score': self.lastScore, 'tableSize': len(self.table)}
+
+    def search(self):
+        """ search from the game's current position. Return bit index of best action, or None if none found """
+        self.state = SearchState(self.game)
+        self.seat = self.state.players.index(self.player)
+        if len(self.table) > self.maxTableSize:
+            self.table.clear()
+        self.nodes = 0
+        start = time.time()
+        self.deadline = start + self.timeBudget
+        bestPos = None
+        self.lastDepth = 0
+        for depth in range(1, self.maxDepth + 1):
+            try:
+                score = self._search(depth, -self.WIN - 1, self.WIN + 1, 0)
+            except _SearchTimeout:
+                break
+            entry = self.table.get(self.state.hash)
+            if entry is not None:
+                bestPos = entry[3]
+            self.lastDepth = depth
+            self.lastScore = score
+            if self.WIN - abs(score) <= depth:
+                break  # won or lost game found within the searched plies; searching deeper will not change outcome
+        elapsed = max(time.time() - start, 1e-6)
+        self.lastNodes = self.nodes
+        self.lastNodesPerSecond = int(self.nodes / elapsed)
+        return bestPos
+
+    def evaluate(self, ply):
+        """ score state from this bot's point of view. Quicker wins and slower losses score better """
+        state = self.state
+        if state.turnType == state.GAME_OVER:
+            if state.get_winner() == self.seat:
+                return self.WIN - ply
+            return -self.WIN + ply
+        score = 0
+        for seat in range(len(state.positions)):
+            if state.disabled[seat]:
+                continue
+            if seat == self.seat:
+                score += state.get_mobility(seat)
+            else:
+                score -= state.get_mobility(seat)
+        return score
+
+    def is_win_score(self, value):
+        """ return True if value scores a won or lost game, rather than mobility """
+        return abs(value) >= self.WIN - self.maxDepth
+
+    def get_table_value(self, value, ply):
+        """ return value scored ply plies below the root as stored in the table: won or lost games are scored by
+        plies from the stored position, not from the root, so an entry still holds when met at another ply
+        """
+        if not self.is_win_score(value):
+            return value
+        return value + ply if value > 0 else value - ply
+
+    def get_searched_value(self, value, ply):
+        """ return table value, as get_table_value stores it, scored from the root for a position ply plies deep """
+        if not self.is_win_score(value):
+            return value
+        return value - ply if value > 0 else value + ply
+
+    def get_ordered_actions(self, tableMove):
+        """ return actions for state, best-looking first. Removals are restricted to tiles around opponents """
+        state = self.state
+        actions = state.get_actions()
+        if state.turnType == state.MOVE_PLAYER:
+            landable = state.get_landable_bits()
+            scored = [(count_bits(state.neighborMasks[pos] & landable), pos) for pos in actions]
+        else:
+            aroundOpponents = 0
+            for seat, pos in enumerate(state.positions):
+                if seat != state.active and not state.disabled[seat]:
+                    aroundOpponents |= state.neighborMasks[pos]
+            nearby = [pos for pos in actions if aroundOpponents >> pos & 1]
+            if nearby:
+                actions = nearby
+            scored = [(0, pos) for pos in actions]
+            for seat, pos in enumerate(state.positions):
+                if seat != state.active and not state.disabled[seat]:
+                    scored = [(score + (state.neighborMasks[pos] >> action & 1), action) for score, action in scored]
+        scored.sort(reverse=True)
+        ordered = [pos for score, pos in scored]
+        if tableMove in ordered:
+            ordered.remove(tableMove)
+            ordered.insert(0, tableMove)
+        return ordered
+
+    def _search(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & 1023 and time.time() > self.deadline:
+            raise _SearchTimeout()
+        state = self.state
+        if depth == 0 or state.turnType == state.GAME_OVER:
+            return self.evaluate(ply)
+        alphaOriginal, betaOriginal = alpha, beta
+        entry = self.table.get(state.hash)
+        tableMove = None
+        if entry is not None:
+            entryDepth, value, flag, tableMove = entry
+            value = self.get_searched_value(value, ply)
+            if entryDepth >= depth and ply > 0:
+                if flag == self.EXACT:
+                    return value
+                elif flag == self.LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+        actions = self.get_ordered_actions(tableMove)
+        if not actions:
+            return self.evaluate(ply)
+        maximizing = state.active == self.seat
+        best = -self.WIN - 1 if maximizing else self.WIN + 1
+        bestMove = actions[0]
+        for pos in actions:
+            record = state.make(pos)
+            value = self._search(depth - 1, alpha, beta, ply + 1)
+            state.unmake(record)
+            if maximizing and value > best:
+                best, bestMove = value, pos
+                alpha = max(alpha, value)
+            elif not maximizing and value < best:
+                best, bestMove = value, pos
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+        if best <= alphaOriginal:
+            flag = self.UPPER
+        elif best >= betaOriginal:
+            flag = self.LOWER
+        else:
+            flag = self.EXACT
+        self.table[state.hash] = (depth, self.get_table_value(best, ply), flag, bestMove)
+        return best
+
+
+def pick_random_bit(bits, rand):
+    """ return index of a randomly chosen bit that is set in integer bits """
+    k = rand.randrange(count_bits(bits))
+    for i in range(k):
+        bits &= bits - 1  # clear lowest set bit
+    return (bits & -bits).bit_length() - 1
+
+
+class _TreeNode(object):
+    """ node of a MonteCarloTree. wins counts playouts won by actor, the seat whose action pos led here """
+    __slots__ = ('pos', 'actor', 'parent', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, pos, actor, parent, untried):
+        self.pos = pos
+        self.actor = actor
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0
+
+
+class MonteCarloTree(object):
+    """ Monte Carlo tree search over a SearchState. Each playout walks down the tree choosing children by UCT,
+    adds one new node, then finishes the game with fast random actions (moves anywhere, removals next to opponents
+    like TileRemoveBot) and credits the winner's actions along the path. With more than two players each node is
+    scored for the seat that acted, so every seat plays for itself.
+
+    Attributes:
+        playouts: playouts run so far
+        exploration: UCT exploration constant. Higher values try more unpromising actions
+    """
+
+    def __init__(self, state, rand=None, exploration=1.4):
+        self.state = state
+        self.rand = rand or random.Random()
+        self.exploration = exploration
+        self.root = _TreeNode(None, None, None, state.get_actions())
+        self.playouts = 0
+
+    def run(self, maxPlayouts=None, timeBudget=None):
+        """ run playouts until maxPlayouts have been run or timeBudget seconds have passed (whichever comes first).
+        Either may be None, but not both
+        """
+        if maxPlayouts is None and timeBudget is None:
+            raise ValueError('MonteCarloTree.run needs maxPlayouts or timeBudget; with neither it would never stop')
+        deadline = None if timeBudget is None else time.time() + timeBudget
+        while maxPlayouts is None or self.playouts < maxPlayouts:
+            if deadline is not None and not self.playouts & 15 and time.time() > deadline:
+                break
+            self.run_playout()
+
+    def get_root_stats(self):
+        """ return dictionary of bit index -> (visits, wins) for every action tried from the root """
+        return dict((child.pos, (child.visits, child.wins)) for child in self.root.children)
+
+    def run_playout(self):
+        state = self.state
+        node = self.root
+        records = []
+        while not node.untried and node.children:
+            node = self._select_child(node)
+            records.append(state.make(node.pos))
+        if node.untried and not state.turnType == state.GAME_OVER:
+            pos = node.untried.pop(self.rand.randrange(len(node.untried)))
+            actor = state.active
+            records.append(state.make(pos))
+            child = _TreeNode(pos, actor, node, state.get_actions())
+            node.children.append(child)
+            node = child
+        winner = self.finish_game()
+        while node is not None:
+            node.visits += 1
+            if node.actor == winner:
+                node.wins += 1
+            node = node.parent
+        for record in reversed(records):
+            state.unmake(record)
+        self.playouts += 1
+
+    def _select_child(self, node):
+        logVisits = math.log(node.visits)
+        exploration = self.exploration
+        best = None
+        bestScore = -1.0
+        for child in node.children:
+            score = 1.0 * child.wins / child.visits + exploration * math.sqrt(logVisits / child.visits)
+            if score > bestScore:
+                best, bestScore = child, score
+        return best
+
+    def finish_game(self):
+        """ play state to the end with fast random actions, then restore it. Return winning seat, or None if the
+        game got stuck without a winner
+        """
+        state = self.state
+        records = []
+        while not state.turnType == state.GAME_OVER:
+            pos = self.get_playout_action()
+            if pos is None:
+                break
+            records.append(state.make(pos))
+        winner = state.get_winner() if state.turnType == state.GAME_OVER else None
+        for record in reversed(records):
+            state.unmake(record)
+        return winner
+
+    def get_playout_action(self):
+        """ return bit index of a random action for the active seat, or None if it has none """
+        state = self.state
+        rand = self.rand
+        if state.turnType == state.MOVE_PLAYER:
+            bits = state.neighborMasks[state.positions[state.active]] & state.get_landable_bits()
+            return pick_random_bit(bits, rand) if bits else None
+        removable = state.get_removable_bits()
+        aroundOpponents = 0
+        for seat, pos in enumerate(state.positions):
+            if seat != state.active and not state.disabled[seat]:
+                aroundOpponents |= state.neighborMasks[pos]
+        aroundMe = state.neighborMasks[state.positions[state.active]]
+        for bits in (removable & aroundOpponents & ~aroundMe, removable & aroundOpponents, removable):
+            if bits:
+                return pick_random_bit(bits, rand)
+        return None
+
+
+def run_tree_search(state, maxPlayouts, timeBudget, exploration, seed):
+    """ search state with a fresh MonteCarloTree. Return (root stats, playouts). Module-level, so worker processes
+    can run it
+    """
+    tree = MonteCarloTree(state, random.Random(seed), exploration)
+    tree.run(maxPlayouts, timeBudget)
+    return tree.get_root_stats(), tree.playouts
+
+
+_executors = dict()  # processes -> ProcessPoolExecutor shared by every MCTSBot
+
+
+def get_executor(processes):
+    if processes not in _executors:
+        _executors[processes] = ProcessPoolExecutor(processes)
+    return _executors[processes]
+
+
+class MCTSBot(RandomBot):
+    """ MCTSBot picks the action most often chosen by Monte Carlo tree search (see MonteCarloTree), so it grows
+    stronger the more playouts it can afford. With processes above 1, every worker process grows its own tree from
+    the current position (root parallelization) and the visit counts of the root actions are added up.
+    Searching stops after playoutBudget playouts (spread across processes) or timeBudget seconds, whichever comes
+    first; either may be None, but not both. Keep processes at 1 when the bot already runs inside a worker process
+    (under Simulator's pool, for example), since pool workers cannot start processes of their own.
+
+    Attributes:
+        timeBudget: seconds allowed to search for each action
+        playoutBudget: playouts allowed for each action
+        processes: worker processes searching in parallel. 1 searches in this process
+        exploration: UCT exploration constant
+        lastPlayouts, lastPlayoutsPerSecond, lastVisits: statistics of the most recent search
+    """
+    timeBudget = 1.0
+    playoutBudget = None
+    processes = 1
+    exploration = 1.4
+
+    def __init__(self, game, board, player):
+        super(MCTSBot, self).__init__(game, board, player)
+        if self.playoutBudget is None and self.timeBudget is None:
+            raise ValueError('MCTSBot needs a playoutBudget or a timeBudget; with neither it would never stop')
+        self.lastPlayouts = 0
+        self.lastPlayoutsPerSecond = 0
+        self.lastVisits = 0
+
+    def take_move_player_turn(self, move_player_fxn):
+        pos = self.search()
+        if pos is None:
+            super(MCTSBot, self).take_move_player_turn(move_player_fxn)
+            return
+        move_player_fxn(*self.state.get_xy(pos))
+
+    def take_remove_tile_turn(self, remove_tile_fxn):
+        pos = self.search()
+        if pos is None:
+            super(MCTSBot, self).take_remove_tile_turn(remove_tile_fxn)
+            return
+        remove_tile_fxn(*self.state.get_xy(pos))
+
+    def get_search_stats(self):
+        """ return dictionary describing the most recent search """
+        return {'playouts': self.lastPlayouts, 'playoutsPerSecond': self.lastPlayoutsPerSecond,
+                'visits': self.lastVisits, 'processes': self.processes}
+
+    def search(self):
+        """ search from the game's current position. Return bit index of most visited action, or None if none """
+        self.state = SearchState(self.game)
+        start = time.time()
+        if self.processes > 1:
+            playouts = None if self.playoutBudget is None else -(-self.playoutBudget // self.processes)
+            executor = get_executor(self.processes)
+            futures = [executor.submit(run_tree_search, self.state, playouts, self.timeBudget, self.exploration,
+                                       random.getrandbits(32)) for i in range(self.processes)]
+            results = [future.result() for future in futures]
+        else:
+            results = [run_tree_search(self.state, self.playoutBudget, self.timeBudget, self.exploration,
+                                       random.getrandbits(32))]
+        elapsed = max(time.time() - start, 1e-6)
+        visits = dict()
+        self.lastPlayouts = 0
+        for rootStats, playouts in results:
+            self.lastPlayouts += playouts
+            for pos, (count, wins) in rootStats.items():
+                visits[pos] = visits.get(pos, 0) + count
+        self.lastPlayoutsPerSecond = int(self.lastPlayouts / elapsed)
+        if not visits:
+            return None
+        self.lastVisits, pos = max((count, pos) for pos, count in visits.items())
+        return pos
+
+
+if __name__ == '__main__':
+    import sys
+    from RobotBoard import RobotGame, RobotGameBoard, MoveBot
+
+    Searcher = MCTSBot if sys.argv[1:] == ['MCTSBot'] else AlphaBetaBot
+
+    class SearchGame(RobotGame):
+        GameBoard = RobotGameBoard
+        Robot = Searcher
+
+    Searcher.timeBudget = 0.2
+    game = SearchGame()
+    game.setup(0, (7, 6), 2)
+    game.robots[game.board.players[1]] = MoveBot(game, game.board, game.board.players[1])
+    while not game.turnType == game.GAME_OVER:
+        robot = game.robots[game.get_active_player()]
+        game.robot_takes_turn()
+        if isinstance(robot, Searcher):
+            print(robot.get_search_stats())
+    print(game.board)
+    print(game.get_active_player().colorName + ' player wins!')
@@ -0,0 +1,159 @@
+""" play many robot-vs-robot games without any html, spread across every processor core. Run directly for a summary:
+    python Simulator.py --games 200 --shape 7x6 --bots MoveBot TileRemoveBot
+Add --record games.log to append every game to a game log (see GameRecord).
+"""
+from __future__ import print_function
+import argparse
+import io
+import multiprocessing
+import random
+import time
+from BitBoard import BitBoardMixin
+from GameRecord import record_game
+from RobotBoard import RobotGame, RobotGameBoard, RandomBot, TileRemoveBot, MoveBot, RegionBot
+from SearchBot import AlphaBetaBot, MCTSBot
+from LazyImport import lazy_import, is_loaded
+np = lazy_import('numpy')
+
+BOTS = dict((bot.__name__, bot) for bot in [RandomBot, TileRemoveBot, MoveBot, RegionBot, AlphaBetaBot,
+                                            MCTSBot])
+
+
+class SimulatedGameBoard(BitBoardMixin, RobotGameBoard):
+    """ RobotGameBoard answering rules from bitmasks, for speed """
+
+
+class SimulatedGame(RobotGame):
+    """ RobotGame where every player is a robot, and each seat may be controlled by a different class of robot """
+    GameBoard = SimulatedGameBoard
+
+    def setup_bots(self, bots, shape):
+        """ set up game with one player per robot class in bots. First robot class takes the first turn """
+        self.setup(len(bots), shape)  # players start human controlled, so no robot of the default class is made
+        self.setup_robots(len(bots), Robot=bots)
+        self.seats = list(self.board.players)  # board.players rotates each turn, so remember original seating
+
+    def play(self, maxPlies):
+        """ let robots take turns until game is over or maxPlies half-turns have been taken. Return plies taken """
+        plies = 0
+        while not self.turnType == self.GAME_OVER and plies < maxPlies:
+            self.robot_takes_turn()
+            plies += 1
+        return plies
+
+
+def play_game(bots, shape, seed, record=False):
+    """ play one complete game between bots, a list of robot classes given in seat order. Random generators are
+    seeded with seed, so a game can be replayed exactly. Return dictionary of the result. winnerSeat is None if game
+    did not finish within a reasonable number of plies. If record is True, the result also holds the game's log as
+    bytes under 'record'
+    """
+    random.seed(seed)
+    game = SimulatedGame()
+    game.setup_bots(bots, shape)
+    if is_loaded('numpy'):  # setup draws only from random, so numpy is seeded in time for robots, if they use it
+        np.random.seed(seed % 2**32)
+    if record:
+        stream = io.BytesIO()
+        record_game(game, stream, seed)
+    w, h = shape
+    plies = game.play(maxPlies=2 * w * h + 2)
+    winnerSeat = None
+    if game.turnType == game.GAME_OVER:
+        winnerSeat = game.seats.index(game.get_active_player())
+    result = {'seed': seed, 'plies': plies, 'winnerSeat': winnerSeat,
+              'winnerBot': None if winnerSeat is None else bots[winnerSeat].__name__}
+    if record:
+        result['record'] = stream.getvalue()
+    return result
+
+
+def _play_game_from_args(args):
+    return play_game(*args)
+
+
+def get_seating(bots, gameIndex, rotateSeats):
+    """ return list of bots in seat order for game number gameIndex. Rotating seats gives every bot a turn at moving
+    first
+    """
+    if not rotateSeats:
+        return list(bots)
+    shift = gameIndex % len(bots)
+    return list(bots[shift:]) + list(bots[:shift])
+
+
+def simulate(bots, numGames=100, shape=(7, 6), processes=None, seed=0, rotateSeats=True, recordPath=None):
+    """ play numGames games between bots (list of robot classes) across a pool of worker processes. processes=None
+    uses every core. Game i is seeded with seed + i, so results do not depend on how games are spread across workers.
+    If recordPath is given, every game is appended to the game log at that path, in seed order.
+    Return dictionary summarizing win rates per seat and per robot class, average game length, and games/sec
+    """
+    record = recordPath is not None
+    jobs = [(get_seating(bots, i, rotateSeats), shape, seed + i, record) for i in range(numGames)]
+    start = time.time()
+    if processes == 1:
+        results = [_play_game_from_args(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            chunksize = max(1, numGames // (4 * (processes or multiprocessing.cpu_count())))
+            results = list(pool.imap_unordered(_play_game_from_args, jobs, chunksize))
+        finally:
+            pool.close()
+            pool.join()
+    elapsed = max(time.time() - start, 1e-6)
+    if record:
+        with open(recordPath, 'ab') as f:
+            for result in sorted(results, key=lambda result: result['seed']):
+                f.write(result.pop('record'))
+    return summarize(results, bots, elapsed)
+
+
+def summarize(results, bots, elapsed):
+    """ gather list of play_game results into win rates, average length, and speed """
+    numGames = len(results)
+    winsBySeat = [0] * len(bots)
+    winsByBot = dict((bot.__name__, 0) for bot in bots)
+    draws = 0
+    for result in results:
+        if result['winnerSeat'] is None:
+            draws += 1
+            continue
+        winsBySeat[result['winnerSeat']] += 1
+        winsByBot[result['winnerBot']] += 1
+    gamesPerBot = dict((name, 0) for name in winsByBot)
+    for bot in bots:
+        gamesPerBot[bot.__name__] += numGames  # a class filling two seats plays twice per game
+    return {'games': numGames,
+            'draws': draws,
+            'seconds': elapsed,
+            'gamesPerSecond': numGames / elapsed,
+            'averagePlies': 1.0 * sum(result['plies'] for result in results) / max(numGames, 1),
+            'winRateBySeat': [1.0 * wins / max(numGames, 1) for wins in winsBySeat],
+            'winRateByBot': dict((name, 1.0 * wins / max(gamesPerBot[name], 1)) for name, wins in winsByBot.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='play robot-vs-robot games without a web server')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--shape', default='7x6', help='board width x height, like 7x6')
+    parser.add_argument('--bots', nargs='+', default=['MoveBot', 'TileRemoveBot'], choices=sorted(BOTS))
+    parser.add_argument('--processes', type=int, default=None, help='worker processes. Default uses every core')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fixed-seats', action='store_true', help='do not rotate which robot moves first')
+    parser.add_argument('--record', help='append every game to the game log at this path')
+    args = parser.parse_args()
+    shape = tuple(int(n) for n in args.shape.lower().split('x'))
+    bots = [BOTS[name] for name in args.bots]
+    summary = simulate(bots, args.games, shape, args.processes, args.seed, not args.fixed_seats, args.record)
+    print(str(summary['games']) + ' games in ' + str(round(summary['seconds'], 2)) + ' seconds (' +
+          str(round(summary['gamesPerSecond'], 1)) + ' games/sec), average length ' +
+          str(round(summary['averagePlies'], 1)) + ' plies, ' + str(summary['draws']) + ' unfinished')
+    for seat, rate in enumerate(summary['winRateBySeat']):
+        print('seat ' + str(seat) + ' win rate: ' + str(round(rate, 3)))
+    for name, rate in sorted(summary['winRateByBot'].items()):
+        print(name + ' win rate: ' + str(round(rate, 3)))
+
+
+if __name__ == '__main__':
+    main()
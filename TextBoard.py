@@ -0,0 +1,217 @@
+""" play in a terminal, without a web server. Robots take their turns inline, right after the human before them:
+    python TextBoard.py --humans 1 --bots 1 --shape 7x6
+Type the x y of a tile to move to (or remove, on a remove-tile turn). Type help for every command.
+With --script, actions are read from stdin instead, one per line, and only problems and the final board are printed:
+    printf '3 4\\n2 2\\n' | python TextBoard.py --script
+"""
+from __future__ import print_function
+import argparse
+import random
+import sys
+from RobotBoard import RobotGame, RobotGameBoard, RandomBot, TileRemoveBot, MoveBot, RegionBot
+from SearchBot import AlphaBetaBot, MCTSBot
+
+BOTS = dict((bot.__name__, bot) for bot in [RandomBot, TileRemoveBot, MoveBot, RegionBot, AlphaBetaBot,
+                                            MCTSBot])
+HELP = """commands:
+  x y           move to (or remove) tile at x, y. x counts columns, y counts rows. 3,4 works too
+  move x y      same, but only on a move turn
+  remove x y    same, but only on a remove-tile turn
+  undo, redo    take back (or replay) your last action and any robot actions after it
+  board         show the board again
+  help          show this help
+  quit          stop playing"""
+
+
+class TextGameBoard(RobotGameBoard):
+    """ GameBoard that renders as text: o for tiles, . for removed tiles, and the seat number for players """
+    TILE_CHAR = 'o'
+    GAP_CHAR = '.'
+
+    def get_text(self, seats):
+        """ return board as lines of text, rows along y. seats is the list of players in seat order """
+        seatOf = dict((player, str(i + 1)) for i, player in enumerate(seats))
+        width = len(str(self.w - 1))
+        lines = [' ' * (width + 3) + ' '.join([str(x).rjust(width) for x in range(self.w)])]
+        for y in range(self.h):
+            cells = []
+            for x in range(self.w):
+                player = self.get_player_at(x, y)
+                if player is not None:
+                    char = seatOf[player]
+                elif self.cellStates[x, y] == self.GAP_STATE:
+                    char = self.GAP_CHAR
+                else:
+                    char = self.TILE_CHAR
+                cells.append(char.rjust(width))
+            lines.append(str(y).rjust(width + 1) + '  ' + ' '.join(cells))
+        return '\n'.join(lines)
+
+
+class TextGame(RobotGame):
+    """ RobotGame controlled by text commands. Robots take their turns as soon as the human before them is done
+
+    Attributes:
+        seats: players in seat order, which (unlike board.players) does not rotate from turn to turn
+    """
+    GameBoard = TextGameBoard
+
+    def setup(self, numPlayers=2, shape=(9,9), numRobots=0):
+        super(TextGame, self).setup(numPlayers, shape, numRobots)
+        self.seats = list(self.board.players)
+
+    def get_player_name(self, player):
+        name = 'Player ' + str(self.seats.index(player) + 1) + ' (' + player.colorName
+        if not player.humanControlled:
+            name += ', robot'
+        return name + ')'
+
+    def get_status(self):
+        """ return line saying whose turn it is and what they must do, or who won """
+        player = self.get_active_player()
+        if self.turnType == self.GAME_OVER:
+            return self.get_player_name(player) + ' wins!'
+        if self.turnType == self.MOVE_PLAYER:
+            return self.get_player_name(player) + ' to move, from ' + str(player.x) + ',' + str(player.y)
+        return self.get_player_name(player) + ' to remove a tile'
+
+    def get_text(self):
+        return self.board.get_text(self.seats) + '\n' + self.get_status()
+
+    def play_robots(self):
+        """ let robots take turns until it is a human's turn or game is over. Return list of lines describing what
+        each robot did
+        """
+        lines = []
+        while not self.turnType == self.GAME_OVER and not self.get_active_player().humanControlled:
+            player = self.get_active_player()
+            turnType = self.turnType
+            plies = len(self.moveStack)
+            self.robot_takes_turn()
+            if len(self.moveStack) == plies:
+                raise RuntimeError(self.get_player_name(player) + ' did not take its turn')
+            x, y = self.moveStack[-1][1:3]
+            verb = ' moves to ' if turnType == self.MOVE_PLAYER else ' removes '
+            lines.append(self.get_player_name(player) + verb + str(x) + ',' + str(y))
+        return lines
+
+    def undo_turn(self):
+        """ undo the last human action, and every robot action after it. Return False if no human has acted yet """
+        humanPlies = [ply for ply, record in enumerate(self.moveStack) if record[5][0].humanControlled]
+        if not humanPlies:
+            return False
+        while len(self.moveStack) > humanPlies[-1]:
+            self.undo()
+        return True
+
+    def redo_turn(self):
+        """ redo actions until it is a human's turn again (or nothing is left to redo). Return False if there was
+        nothing to redo
+        """
+        if not self.redo():
+            return False
+        while not self.turnType == self.GAME_OVER and not self.get_active_player().humanControlled and self.redo():
+            pass
+        return True
+
+    def run_command(self, line):
+        """ carry out one text command. Return list of lines to show, or None if the player asked to quit.
+        Lines starting with '!' report a command that could not be carried out
+        """
+        words = line.replace(',', ' ').split()
+        if not words:
+            return []
+        command = words[0].lower()
+        if command in ('quit', 'exit', 'q'):
+            return None
+        if command in ('help', '?'):
+            return [HELP]
+        if command == 'board':
+            return [self.get_text()]
+        if command in ('undo', 'u'):
+            return [self.get_text()] if self.undo_turn() else ['! nothing to undo']
+        if command in ('redo', 'r'):
+            return [self.get_text()] if self.redo_turn() else ['! nothing to redo']
+        if self.turnType == self.GAME_OVER:
+            return ['! game is over. ' + self.get_status()]
+        if command in ('move', 'm', 'remove', 'rm'):
+            wanted = self.MOVE_PLAYER if command in ('move', 'm') else self.REMOVE_TILE
+            if not wanted == self.turnType:
+                return ['! ' + self.get_status()]
+            words = words[1:]
+        try:
+            x, y = [int(word) for word in words]
+        except ValueError:
+            return ['! expected x y, got: ' + line.strip()]
+        if self.turnType == self.MOVE_PLAYER:
+            self.player_moves_player(x, y)
+        else:
+            self.player_removes_tile(x, y)
+        if not self.turnSuccessful:
+            return ['! cannot ' + ('move to ' if self.turnType == self.MOVE_PLAYER else 'remove ') + str(x) + ',' +
+                    str(y)]
+        return self.play_robots() + [self.get_text()]
+
+
+def play_interactive(game, read_line=None, out=sys.stdout):
+    """ play game, prompting for commands with read_line (input() by default) until game is over or player quits """
+    read_line = read_line or input
+    for line in game.play_robots():  # robots seated first play before anyone is asked
+        print(line, file=out)
+    print(game.get_text(), file=out)
+    while True:
+        try:
+            line = read_line('> ')
+        except EOFError:
+            break
+        output = game.run_command(line)
+        if output is None:
+            break
+        for text in output:
+            print(text, file=out)
+
+
+def play_script(game, lines, out=sys.stdout):
+    """ carry out every command in lines (comments start with #), then print the final board. Return number of
+    commands that could not be carried out
+    """
+    failures = 0
+    game.play_robots()
+    for number, line in enumerate(lines):
+        line = line.split('#')[0]
+        output = game.run_command(line)
+        if output is None:
+            break
+        for text in output:
+            if text.startswith('!'):
+                failures += 1
+                print('line ' + str(number + 1) + ': ' + text[2:], file=out)
+    print(game.get_text(), file=out)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='play pysolation in a terminal')
+    parser.add_argument('--humans', type=int, default=1)
+    parser.add_argument('--bots', type=int, default=1)
+    parser.add_argument('--shape', default='7x6', help='board width x height, like 7x6')
+    parser.add_argument('--robot', default='MoveBot', choices=sorted(BOTS), help='class of robot playing every bot')
+    parser.add_argument('--seed', type=int, default=None, help='seed robot randomness, to repeat a game')
+    parser.add_argument('--script', action='store_true', help='read commands from stdin without prompting')
+    args = parser.parse_args(argv)
+    if args.humans + args.bots < 2:
+        parser.error('need at least 2 players')
+    shape = tuple(int(n) for n in args.shape.lower().split('x'))
+    if args.seed is not None:
+        random.seed(args.seed)
+    game = TextGame()
+    game.Robot = BOTS[args.robot]
+    game.setup(args.humans, shape, args.bots)
+    if args.script:
+        return 1 if play_script(game, sys.stdin) else 0
+    play_interactive(game)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
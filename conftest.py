@@ -0,0 +1,48 @@
+import random
+import pytest
+
+
+def play_randomly(game, seed=0, maxPlies=200, undoChance=0.0):
+    """ play random legal actions in game until it is over or maxPlies actions were taken, undoing the last action
+    instead with probability undoChance. Yields game before every step, and once more at the end
+    """
+    rand = random.Random(seed)
+    for ply in range(maxPlies):
+        yield game
+        if game.turnType == game.GAME_OVER:
+            return
+        if game.moveStack and rand.random() < undoChance:
+            game.undo()
+            continue
+        player = game.get_active_player()
+        if game.turnType == game.MOVE_PLAYER:
+            tiles = game.board.get_landable_tiles_around(player.x, player.y)
+            tile = rand.choice(sorted(tiles, key=lambda t: (t.x, t.y)))
+            game.player_moves_player(tile.x, tile.y)
+        else:
+            tile = rand.choice(sorted(game.board.get_all_open_removable_tiles(), key=lambda t: (t.x, t.y)))
+            game.player_removes_tile(tile.x, tile.y)
+    yield game
+
+
+def get_game_state(game):
+    """ return everything a game's rules depend on, to compare positions of games set up alike: turn type, cell
+    states, landable counts, solid cells, and every player's seat, position and flags. Positions are compared
+    between games, so players are told apart by seat, not identity
+    """
+    board = game.board
+    return (game.turnType, board.cellStates.tolist(), list(board.landableCounts), sorted(board.solidCells),
+            [(p.x, p.y, p.disabled, p.active, p.humanControlled) for p in board.players],
+            [(x, y, tile.visible, tile.solid) for x, y, tile in board])
+
+
+@pytest.fixture
+def random_play():
+    """ play_randomly, for tests driving a game through random legal actions """
+    return play_randomly
+
+
+@pytest.fixture
+def game_state():
+    """ get_game_state, for tests comparing positions """
+    return get_game_state
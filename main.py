@@ -1,37 +1,159 @@
-from HtmlBoard import HtmlGame
+from flask import Flask, abort, jsonify, redirect, request
+from GameSessions import GameRegistry
+from HtmlBoard import LazyHtmlGame, LazyClientHtmlGame
+from RobotDispatcher import RobotDispatcher
 # run this module to play the browsers-supported game
 
-if __name__ == '__main__':
-    from flask import Flask
+MAX_BOARD_DIMENSION = 50
+MAX_PLAYERS = 6
+MAX_ROBOT_WAIT = 10  # seconds a request may wait for a robot to finish its turn
+
+
+def create_game_factory(Game=LazyClientHtmlGame):
+    """ return function that sets up a new game of class Game, clamping requested sizes to sensible limits. Games
+    default to a lazy board, which holds about a third of the memory of a regular board on large boards, for about
+    the same cost per request
+    """
+    def game_factory(humans=2, bots=1, shape=(7, 6)):
+        bots = min(max(bots, 0), MAX_PLAYERS)
+        humans = min(max(humans, 0), MAX_PLAYERS - bots)
+        if humans + bots < 2:
+            humans = 2 - bots
+        w, h = [min(max(n, 2), MAX_BOARD_DIMENSION) for n in shape]
+        game = Game()
+        game.setup(humans, (w, h), bots)
+        return game
+    return game_factory
+
+
+def get_landing_html():
+    """ return html of the landing page: a form choosing players and board size, posted to /games/new """
+    fields = [('humans', 'Humans', 2, 0, MAX_PLAYERS), ('bots', 'Robots', 1, 0, MAX_PLAYERS),
+              ('w', 'Width', 7, 2, MAX_BOARD_DIMENSION), ('h', 'Height', 6, 2, MAX_BOARD_DIMENSION)]
+    html = '<h1>New game</h1><form method="post" action="/games/new">'
+    for name, label, default, low, high in fields:
+        html += ('<label>' + label + ' <input type="number" name="' + name + '" value="' + str(default) +
+                 '" min="' + str(low) + '" max="' + str(high) + '"></label><br>')
+    html += '<button type="submit">Start game</button></form>'
+    return html
+
+
+def create_app(registry, dispatcher=None):
+    """ return flask app hosting every game in registry. / serves a form starting a new game, which it posts to
+    /games/new (a GET there, like a crawler's or a prefetch, creates nothing). Each game lives below
+    /games/<gameId>/. Every page route
+    returns the full html page. Routes under /games/<gameId>/api return JSON instead: api/state gives the full game
+    state, and the action routes give only what changed after the ?since= version passed by the client.
+    Requests on the same game are handled one at a time; requests on different games run in parallel.
+    Robot turns are decided in the background by dispatcher; robot routes return at once, or after waiting up to
+    ?wait= seconds for the robot to finish
+    """
     app = Flask(__name__)  # http://flask.pocoo.org/docs/0.10/quickstart/#quickstart
+    dispatcher = dispatcher or RobotDispatcher()
+
+    def get_session(gameId):
+        session = registry.get(gameId)
+        if session is None:
+            abort(404)
+        return session
+
+    def play(gameId, action):
+        """ run action(game) while holding game's lock, and return its result """
+        session = get_session(gameId)
+        with session.lock:
+            return action(session.game)
 
-    game = HtmlGame()
-    number_of_bots = 1
-    number_of_humans = 2
-    board_dimensions = (7, 6)
-    
-    game.setup(number_of_humans, board_dimensions, number_of_bots)
+    def get_since():
+        return request.args.get('since', 0, type=int)
 
     @app.route("/")
     def root_url():
-        return game.get_html()
+        return get_landing_html()
+
+    @app.route("/games/new", methods=['POST'])
+    def new_game():
+        """ start a new game. Optional form fields: humans=2, bots=1, w=7, h=6 """
+        args = request.form
+        shape = (args.get('w', 7, type=int), args.get('h', 6, type=int))
+        session = registry.create(humans=args.get('humans', 2, type=int), bots=args.get('bots', 1, type=int),
+                                  shape=shape)
+        gameRoot = '/games/' + session.gameId
+        session.game.set_link_root(gameRoot)
+        return redirect(gameRoot + '/', code=303)  # see other: the browser follows with a GET
+
+    @app.route("/games/<gameId>/")
+    def game_url(gameId):
+        return play(gameId, lambda game: game.get_html())
 
-    @app.route("/move_player_to/<int:x>,<int:y>")
-    def move_player_to(x, y):
-        game.player_moves_player(x, y)
-        return game.get_html()
+    @app.route("/games/<gameId>/move_player_to/<int:x>,<int:y>")
+    def move_player_to(gameId, x, y):
+        def action(game):
+            game.player_moves_player(x, y)
+            return game.get_html()
+        return play(gameId, action)
 
-    @app.route("/remove_tile_at/<int:x>,<int:y>")
-    def remove_tile_at(x, y):
-        game.player_removes_tile(x, y)
-        return game.get_html()
+    @app.route("/games/<gameId>/remove_tile_at/<int:x>,<int:y>")
+    def remove_tile_at(gameId, x, y):
+        def action(game):
+            game.player_removes_tile(x, y)
+            return game.get_html()
+        return play(gameId, action)
 
-    @app.route("/robot_takes_turn/")
-    def robot_takes_turn():
-        game.robot_takes_turn()
-        return game.get_html()
+    def start_robot_turn(session):
+        """ start robot turn in the background, then wait up to ?wait= seconds for it to finish """
+        dispatcher.start(session)
+        wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_ROBOT_WAIT)
+        if wait:
+            dispatcher.wait(session, wait)
 
-    app.run(debug=True)  # run with debug=True to allow interaction & feedback when
+    @app.route("/games/<gameId>/robot_takes_turn/")
+    def robot_takes_turn(gameId):
+        session = get_session(gameId)
+        start_robot_turn(session)
+        return play(gameId, lambda game: game.get_html())  # page reloads itself until robot is done
+
+    @app.route("/games/<gameId>/api/state")
+    def api_state(gameId):
+        return play(gameId, lambda game: jsonify(game.get_state()))
+
+    @app.route("/games/<gameId>/api/move/<int:x>,<int:y>")
+    def api_move(gameId, x, y):
+        since = get_since()
+        def action(game):
+            game.player_moves_player(x, y)
+            return jsonify(game.get_delta(since))
+        return play(gameId, action)
+
+    @app.route("/games/<gameId>/api/remove/<int:x>,<int:y>")
+    def api_remove(gameId, x, y):
+        since = get_since()
+        def action(game):
+            game.player_removes_tile(x, y)
+            return jsonify(game.get_delta(since))
+        return play(gameId, action)
+
+    @app.route("/games/<gameId>/api/robot_step")
+    def api_robot_step(gameId):
+        since = get_since()
+        session = get_session(gameId)
+        start_robot_turn(session)
+        def action(game):
+            delta = game.get_delta(since)
+            delta['robotPending'] = dispatcher.is_pending(session)
+            return jsonify(delta)
+        return play(gameId, action)
+
+    return app
+
+
+if __name__ == '__main__':
+    client_side_rendering = True  # page updates itself from JSON deltas. False reloads the full page every action
+    game_factory = create_game_factory(LazyClientHtmlGame if client_side_rendering else LazyHtmlGame)
+    registry = GameRegistry(game_factory, maxGames=500, ttl=3600)  # idle games are dropped after an hour
+    dispatcher = RobotDispatcher(deadline=2.0)  # robots taking longer than 2 seconds get a quick fallback action
+    app = create_app(registry, dispatcher)
+    # visit http://127.0.0.1:5000/ and pick players and board size to start a game
+
+    app.run(debug=True, threaded=True)  # run with debug=True to allow interaction & feedback when
                     # error / exception occurs.
                     # however, debug mode is super unsecure, so don't use it when allowing any ip connection
-
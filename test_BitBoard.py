@@ -0,0 +1,69 @@
+import random
+import pytest
+from Benchmark import time_call
+from BitBoard import BitGame
+from Game import Game
+
+
+def get_coordinates(tiles):
+    return sorted((tile.x, tile.y) for tile in tiles)
+
+
+def assert_same_rules(board, bitBoard):
+    """ assert bitBoard answers every rule check and tile search the way board does """
+    assert get_coordinates(bitBoard.get_all_open_removable_tiles()) == \
+        get_coordinates(board.get_all_open_removable_tiles())
+    for player, bitPlayer in zip(board.players, bitBoard.players):
+        assert (bitPlayer.x, bitPlayer.y) == (player.x, player.y)
+        assert bitBoard.is_player_trapped(bitPlayer) == board.is_player_trapped(player)
+        assert get_coordinates(bitBoard.get_landable_tiles_around(player.x, player.y)) == \
+            get_coordinates(board.get_landable_tiles_around(player.x, player.y))
+        for x in range(player.x - 2, player.x + 3):
+            for y in range(player.y - 2, player.y + 3):
+                assert bitBoard.is_valid_player_move(bitPlayer, x, y) == board.is_valid_player_move(player, x, y)
+    for x in range(board.w):
+        for y in range(board.h):
+            assert bitBoard.is_valid_tile_remove(x, y) == board.is_valid_tile_remove(x, y)
+    assert bitBoard.landableCounts == board.landableCounts
+
+
+@pytest.mark.parametrize('shape', [(7, 6), (3, 9), (10, 10)])
+@pytest.mark.parametrize('seed', range(3))
+def test_bit_board_answers_rules_like_board(random_play, shape, seed):
+    game = Game()
+    game.setup(2 + seed, shape)
+    bitGame = BitGame()
+    bitGame.setup(2 + seed, shape)
+    game.board.set_solid_at(shape[0] // 2, shape[1] // 2, True)
+    bitGame.board.set_solid_at(shape[0] // 2, shape[1] // 2, True)
+    for bitGame in random_play(bitGame, seed):
+        for turnType, x, y in [record[:3] for record in bitGame.moveStack[len(game.moveStack):]]:
+            game.make(x, y)
+        assert bitGame.turnType == game.turnType
+        assert_same_rules(game.board, bitGame.board)
+
+
+def make_midgame_board(Game, seed=0):
+    """ return board of a 2 player 7x6 game with 8 tiles removed at random """
+    game = Game()
+    game.setup(2, (7, 6))
+    tiles = get_coordinates(game.board.get_all_open_removable_tiles())
+    for x, y in random.Random(seed).sample(tiles, 8):
+        game.board.remove_at(x, y)
+    return game.board
+
+
+def time_rule_checks(board):
+    def run():
+        board.get_all_open_removable_tiles()
+        for player in board.players:
+            board.is_player_trapped(player)
+            board.get_landable_tiles_around(player.x, player.y)
+    return time_call(run, minTime=0.05)
+
+
+def test_bit_board_checks_rules_faster():
+    """ about 4x faster on a 7x6 board. Moves cost about the same on both boards, as a bit board still updates its
+    Tiles too, so whole random games play only about 2x faster
+    """
+    assert time_rule_checks(make_midgame_board(BitGame)) * 2 < time_rule_checks(make_midgame_board(Game))
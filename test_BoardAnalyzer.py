@@ -0,0 +1,109 @@
+import pytest
+import numpy as np
+from BoardAnalyzer import SweetSpotGrid, label_regions, label_nearest, TIE, UNREACHED
+
+
+def make_random_grid(seed, shape, gapChance=0.3):
+    """ return float grid of shape with tiles (1) and, with probability gapChance per cell, gaps (0) """
+    return (np.random.RandomState(seed).random_sample(shape) > gapChance) * 1.0
+
+
+def set_gaps_pointwise(grid, originalGrid):
+    """ reference set_gaps, zeroing grid cell by cell where originalGrid holds a gap """
+    grid = grid.copy()
+    for x, col in enumerate(originalGrid):
+        for y, val in enumerate(col):
+            if val == SweetSpotGrid.GAP:
+                grid[x, y] = SweetSpotGrid.GAP
+    return grid
+
+
+def label_regions_pointwise(mask):
+    """ reference label_regions, flood filling one region at a time; regions are numbered in the order found """
+    labels = np.zeros(mask.shape, dtype=int)
+    region = 0
+    for start in zip(*np.nonzero(mask)):
+        if labels[start]:
+            continue
+        region += 1
+        labels[start] = region
+        frontier = [start]
+        while frontier:
+            x, y = frontier.pop()
+            for x2 in range(max(x - 1, 0), min(x + 2, mask.shape[0])):
+                for y2 in range(max(y - 1, 0), min(y + 2, mask.shape[1])):
+                    if mask[x2, y2] and not labels[x2, y2]:
+                        labels[x2, y2] = region
+                        frontier.append((x2, y2))
+    return labels
+
+
+def get_distances_pointwise(passable, x, y):
+    """ return grid of waves from x, y across passable, 1 at x, y and np.Inf where unreached, searched breadth first """
+    distances = np.empty(passable.shape)
+    distances.fill(np.Inf)
+    distances[x, y] = 1
+    frontier = [(x, y)]
+    while frontier:
+        nextwave = []
+        for x, y in frontier:
+            for x2 in range(max(x - 1, 0), min(x + 2, passable.shape[0])):
+                for y2 in range(max(y - 1, 0), min(y + 2, passable.shape[1])):
+                    if passable[x2, y2] and distances[x2, y2] == np.Inf:
+                        distances[x2, y2] = distances[x, y] + 1
+                        nextwave.append((x2, y2))
+        frontier = nextwave
+    return distances
+
+
+def label_nearest_pointwise(passable, points):
+    """ reference label_nearest, expanding from one point at a time and comparing distances cell by cell """
+    perPoint = np.array([get_distances_pointwise(passable, x, y) for x, y in points])
+    distances = perPoint.min(axis=0)
+    labels = np.where((perPoint == distances).sum(axis=0) == 1, perPoint.argmin(axis=0), TIE)
+    labels[distances == np.Inf] = UNREACHED
+    return labels, distances
+
+
+@pytest.mark.parametrize('shape', [(7, 6), (20, 15), (50, 50), (1, 8)])
+@pytest.mark.parametrize('seed', range(5))
+def test_wavefront_expansion_matches_pointwise(shape, seed):
+    g = make_random_grid(seed, shape)
+    ssg = SweetSpotGrid(lambda **kwargs: g)
+    w, h = shape
+    rand = np.random.RandomState(seed)
+    for points in [[(0, 0), (w - 1, h - 1)], [(rand.randint(w), rand.randint(h)) for i in range(3)]]:
+        assert np.array_equal(ssg.expand_from_points(g, points), ssg._expand_from_points_pointwise(g, points))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_set_gaps_matches_pointwise(seed):
+    g = make_random_grid(seed, (9, 7))
+    ssg = SweetSpotGrid(lambda **kwargs: g)
+    values = np.random.RandomState(seed).random_sample(g.shape)
+    assert np.array_equal(ssg.set_gaps(values), set_gaps_pointwise(values, g))
+
+
+@pytest.mark.parametrize('shape', [(7, 6), (20, 15), (1, 8)])
+@pytest.mark.parametrize('gapChance', [0.3, 0.6, 0.0, 1.0])
+@pytest.mark.parametrize('seed', range(5))
+def test_label_regions_matches_flood_fill(shape, gapChance, seed):
+    mask = make_random_grid(seed, shape, gapChance) != 0
+    labels, expected = label_regions(mask), label_regions_pointwise(mask)
+    assert ((labels == 0) == ~mask).all()
+    assert sorted(set(labels[mask])) == list(range(1, expected.max() + 1))  # numbered 1, 2, 3... without holes
+    pairs = set(zip(labels[mask], expected[mask]))
+    assert len(pairs) == len(set(labels[mask])) == len(set(expected[mask]))  # same regions, whatever their numbers
+
+
+@pytest.mark.parametrize('shape', [(7, 6), (20, 15), (1, 8)])
+@pytest.mark.parametrize('numPoints', [1, 2, 5, 70])
+@pytest.mark.parametrize('seed', range(5))
+def test_label_nearest_matches_pointwise(shape, numPoints, seed):
+    passable = make_random_grid(seed, shape) != 0
+    rand = np.random.RandomState(seed)
+    points = [(rand.randint(shape[0]), rand.randint(shape[1])) for i in range(numPoints)]  # may repeat, or be gaps
+    labels, distances = label_nearest(passable, points)
+    expectedLabels, expectedDistances = label_nearest_pointwise(passable, points)
+    assert np.array_equal(distances, expectedDistances)
+    assert np.array_equal(labels, expectedLabels)
@@ -0,0 +1,30 @@
+import pytest
+from BitBoard import BitGame
+from Game import Game, LazyGame
+
+
+@pytest.mark.parametrize('Game', [Game, LazyGame, BitGame])
+@pytest.mark.parametrize('seed', range(3))
+def test_undo_and_redo_restore_every_position(random_play, game_state, Game, seed):
+    game = Game()
+    game.setup(2 + seed, (6, 5))
+    game.board.set_solid_at(1, 1, True)
+    states = dict((len(game.moveStack), game_state(game)) for game in random_play(game, seed))  # by actions taken
+    players = list(game.board.players)
+    while game.undo():
+        assert game_state(game) == states[len(game.moveStack)]
+    assert len(game.redoStack) == len(states) - 1
+    while game.redo():
+        assert game_state(game) == states[len(game.moveStack)]
+    assert sorted(game.board.players, key=id) == sorted(players, key=id)  # the same players, not copies
+
+
+def test_undo_keeps_bits_in_step_with_tiles(random_play):
+    game = BitGame()
+    game.setup(3, (6, 5))
+    for game in random_play(game, seed=1, undoChance=0.3):
+        board = game.board
+        for x, y, tile in board:
+            bit = board.bit_at(x, y)
+            assert bool(board.visibleBits & bit) == tile.visible
+            assert bool(board.occupiedBits & bit) == (tile.player is not None)
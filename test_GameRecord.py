@@ -0,0 +1,40 @@
+import io
+import pytest
+from BitBoard import BitGame
+from Game import Game
+from GameRecord import read_games, record_game
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_replay_reaches_every_logged_position(random_play, game_state, seed):
+    game = Game()
+    game.setup(2 + seed, (6, 5))
+    game.board.players[-1].humanControlled = False  # logged as a robot seat; Game itself lets anyone play it
+    stream = io.BytesIO()
+    record_game(game, stream, seed)
+    states = [game_state(game) for game in random_play(game, seed, maxPlies=1000, undoChance=0.2)]
+    assert game.turnType == game.GAME_OVER
+    log, = read_games(io.BytesIO(stream.getvalue()))
+    assert (log.shape, log.numPlayers, log.seed, len(log)) == ((6, 5), 2 + seed, seed, len(states) - 1)
+    for ply, state in enumerate(states):
+        for ReplayGame in [BitGame, Game]:
+            assert game_state(log.replay(ply, ReplayGame)) == state
+
+
+def test_games_recorded_midway_and_back_to_back_read_back(random_play, game_state):
+    stream = io.BytesIO()
+    ends = []
+    for seed in range(3):
+        game = Game()
+        game.setup(2, (5, 4))
+        plays = random_play(game, seed, maxPlies=12)
+        for game in plays:
+            if len(game.moveStack) == 5:
+                break
+        record_game(game, stream)  # actions already taken are written first
+        for game in plays:
+            pass
+        ends.append(game_state(game))
+    logs = read_games(io.BytesIO(stream.getvalue() + b'\x01\x02'))  # a record cut short is ignored
+    assert [game_state(log.replay()) for log in logs] == ends
+    assert [log.seed for log in logs] == [None] * 3
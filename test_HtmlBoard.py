@@ -0,0 +1,26 @@
+import pytest
+import HtmlBoard
+
+
+def export_uncached(board):
+    """ return html of board exported from scratch, tile by tile, the way get_html did before caching """
+    rows = []
+    for x in range(board.w):
+        tiles = ''
+        for y in range(board.h):
+            link = None if board.removeLinkRoot is None else board.removeLinkRoot + str(x) + ',' + str(y)
+            tiles += board[x, y].get_html(link)
+        rows.append('<div class="row">' + tiles + '</div>')
+    return ''.join(rows) + board.footer
+
+
+@pytest.mark.parametrize('Game', [HtmlBoard.HtmlGame, HtmlBoard.SlotHtmlGame, HtmlBoard.LazyHtmlGame,
+                                  HtmlBoard.BitHtmlGame, HtmlBoard.ClientHtmlGame, HtmlBoard.LazyClientHtmlGame])
+@pytest.mark.parametrize('seed', range(4))
+def test_cached_html_matches_uncached_export(random_play, Game, seed):
+    game = Game()
+    game.setup(2 + seed % 2, (7, 6))
+    game.set_link_root('/games/' + str(seed))
+    for game in random_play(game, seed, undoChance=0.1):
+        html = game.get_html()  # sets the links of the turn, then exports the board from its caches
+        assert html == game.get_cached_style() + export_uncached(game.board) + game.get_scripts()
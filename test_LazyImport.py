@@ -0,0 +1,54 @@
+import sys
+import threading
+import pytest
+from LazyImport import lazy_import, is_loaded
+
+
+@pytest.fixture
+def write_module(tmp_path, monkeypatch):
+    """ return function writing module code under a new name to a directory on sys.path. Returns the name """
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = []
+
+    def write(name, code):
+        (tmp_path / (name + '.py')).write_text(code)
+        names.append(name)
+        return name
+    yield write
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def test_module_runs_once_when_first_used_by_many_threads(write_module, tmp_path):
+    runs = tmp_path / 'runs.txt'
+    name = write_module('lazy_slow', 'import time\n'
+                                     'with open(%r, "a") as f:\n'
+                                     '    f.write("run\\n")\n'
+                                     'time.sleep(0.2)  # widen the window for other threads to find it half loaded\n'
+                                     'VALUE = 42\n' % str(runs))
+    module = lazy_import(name)
+    assert not is_loaded(name)
+    start = threading.Barrier(8)
+    values = []
+
+    def use():
+        start.wait()
+        values.append(module.VALUE)
+    threads = [threading.Thread(target=use) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert values == [42] * 8
+    assert runs.read_text() == 'run\n'
+    assert is_loaded(name)
+
+
+def test_failed_module_is_not_left_half_loaded(write_module):
+    name = write_module('lazy_broken', 'VALUE = 42\nraise RuntimeError("broken")\n')
+    module = lazy_import(name)
+    with pytest.raises(RuntimeError):
+        module.VALUE
+    assert name not in sys.modules
+    with pytest.raises(RuntimeError):
+        lazy_import(name).VALUE  # the failure is raised again, instead of a half loaded module being returned
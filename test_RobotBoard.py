@@ -0,0 +1,33 @@
+from RobotBoard import RobotGame, MoveBot
+
+
+def make_isolated_game():
+    """ return game on a 6x3 board split by removing column 2: player a at 0,0 shares its region with disabled
+    player d at 1,0, while player o is alone at 5,2
+    """
+    game = RobotGame()
+    game.setup(0, (6, 3), 3)
+    board = game.board
+    a, d, o = board.players
+    for player, (x, y) in zip((a, d, o), [(0, 0), (1, 0), (5, 2)]):
+        board.move_player(player, x, y)
+    for y in range(3):
+        board.remove_at(2, y)
+    d.disabled = True
+    return game, a, d, o
+
+
+def test_endgame_move_avoids_disabled_player():
+    game, a, d, o = make_isolated_game()
+    target = MoveBot(game, game.board, a).get_endgame_move()
+    assert target is not None
+    assert target != (d.x, d.y)
+    assert game.board.is_valid_player_move(a, *target)
+
+
+def test_endgame_removal_avoids_players():
+    game, a, d, o = make_isolated_game()
+    target = MoveBot(game, game.board, o).get_endgame_removal()
+    assert target is not None
+    assert target not in [(a.x, a.y), (d.x, d.y)]
+    assert game.board.is_valid_tile_remove(*target)
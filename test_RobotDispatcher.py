@@ -0,0 +1,80 @@
+import threading
+import pytest
+from GameSessions import GameSession
+from RobotBoard import RobotGame, MoveBot
+from RobotDispatcher import RobotDispatcher, snapshot_game
+
+
+class BlockingBot(MoveBot):
+    """ MoveBot that decides only once the test sets release, noting which game it was asked about """
+    release = None
+    searched = None
+
+    def take_move_player_turn(self, move_player_fxn):
+        self.searched.append(self.game)
+        self.release.wait(10)
+        super(BlockingBot, self).take_move_player_turn(move_player_fxn)
+
+
+@pytest.fixture
+def session():
+    """ session of a 5x4 game whose first player, the active one, is a BlockingBot """
+    BlockingBot.release = threading.Event()
+    BlockingBot.searched = []
+    game = RobotGame()
+    game.setup(2, (5, 4))
+    game.setup_robots(1, Robot=BlockingBot)
+    yield GameSession('test', game)
+    BlockingBot.release.set()
+
+
+def test_late_result_dropped_when_turn_changed(session):
+    dispatcher = RobotDispatcher(deadline=10)
+    game = session.game
+    job = dispatcher.start(session)
+    with session.lock:
+        game.board.remove_at(4, 3)  # the game moves on while the robot is deciding
+        cellStates = game.board.cellStates.copy()
+    BlockingBot.release.set()
+    assert job.finished.wait(10)
+    assert job.source == 'robot'
+    assert game.moveStack == []
+    assert (game.board.cellStates == cellStates).all()
+
+
+def test_late_result_dropped_after_fallback(session):
+    dispatcher = RobotDispatcher(deadline=0.05)
+    game = session.game
+    job = dispatcher.start(session)
+    assert job.finished.wait(10)
+    assert job.source == 'fallback'
+    assert len(game.moveStack) == 1
+    BlockingBot.release.set()
+    job.future.result(10)
+    assert len(game.moveStack) == 1
+
+
+def test_robot_searches_snapshot(session):
+    dispatcher = RobotDispatcher(deadline=10)
+    BlockingBot.release.set()
+    job = dispatcher.start(session)
+    assert job.finished.wait(10)
+    assert job.source == 'robot'
+    assert len(session.game.moveStack) == 1
+    assert BlockingBot.searched and session.game not in BlockingBot.searched
+
+
+def test_snapshot_matches_game(random_play):
+    game = RobotGame()
+    game.setup(1, (6, 5), 2)
+    game.board.set_solid_at(0, 4, True)
+    for game in random_play(game, seed=3, maxPlies=20):
+        snapshot = snapshot_game(game)
+        board, copy = game.board, snapshot.board
+        assert (copy.cellStates == board.cellStates).all()
+        assert copy.landableCounts == board.landableCounts
+        assert [(p.x, p.y, p.disabled) for p in copy.players] == [(p.x, p.y, p.disabled) for p in board.players]
+        assert snapshot.turnType == game.turnType
+        for x, y, tile in board:
+            assert copy.is_valid_tile_remove(x, y) == board.is_valid_tile_remove(x, y)
+        assert set(snapshot.robots) == set(p for p in copy.players if not p.humanControlled)
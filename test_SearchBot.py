@@ -0,0 +1,28 @@
+import pytest
+from RobotBoard import RobotGame
+from SearchBot import AlphaBetaBot
+
+
+def make_bot(game, player):
+    """ return AlphaBetaBot for player that searches until it solves a small game, never running out of time """
+    bot = AlphaBetaBot(game, game.board, player)
+    bot.timeBudget = 60
+    bot.maxDepth = 12
+    return bot
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_table_kept_between_turns_scores_like_fresh_search(random_play, seed):
+    """ a bot keeps its transposition table from turn to turn, where every entry is met closer to the root than it
+    was stored. Won and lost games must still score the same as on an empty table
+    """
+    game = RobotGame()
+    game.setup(2, (4, 3))
+    bot = make_bot(game, game.board.players[0])
+    for game in random_play(game, seed):
+        if game.turnType == game.GAME_OVER or game.get_active_player() is not bot.player:
+            continue
+        fresh = make_bot(game, bot.player)
+        bot.search()
+        fresh.search()
+        assert (bot.lastScore, bot.lastDepth) == (fresh.lastScore, fresh.lastDepth)
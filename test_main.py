@@ -0,0 +1,47 @@
+import re
+import pytest
+from GameSessions import GameRegistry
+from main import create_app, create_game_factory
+
+
+@pytest.fixture
+def registry():
+    return GameRegistry(create_game_factory())
+
+
+@pytest.fixture
+def client(registry):
+    return create_app(registry).test_client()
+
+
+def test_landing_page_posts_form_without_starting_game(client, registry):
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b'<form method="post" action="/games/new">' in response.data
+    assert len(registry) == 0
+
+
+def test_get_of_new_game_starts_nothing(client, registry):
+    assert client.get('/games/new', follow_redirects=True).status_code in (404, 405)  # may be read as a game id
+    assert len(registry) == 0
+
+
+def test_posted_form_starts_game_and_redirects_to_it(client, registry):
+    response = client.post('/games/new', data={'humans': 3, 'bots': 0, 'w': 9, 'h': 4})
+    assert response.status_code == 303
+    gameId, = re.match(r'^/games/([^/]+)/$', response.headers['Location']).groups()
+    game = registry.get(gameId).game
+    assert (game.board.w, game.board.h, len(game.board.players)) == (9, 4, 3)
+    page = client.get(response.headers['Location'])
+    assert page.status_code == 200
+    assert ('/games/' + gameId + '/').encode() in page.data  # actions link back to this game
+
+
+def test_posted_sizes_are_clamped(client, registry):
+    response = client.post('/games/new', data={'humans': 0, 'bots': 0, 'w': 500, 'h': 1})
+    game = registry.get(response.headers['Location'].split('/')[2]).game
+    assert (game.board.w, game.board.h, len(game.board.players)) == (50, 2, 2)
+
+
+def test_unknown_game_is_not_found(client):
+    assert client.get('/games/nosuchgame/').status_code == 404